@@ -0,0 +1,66 @@
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from pfread.passes import cross
+from pfread.preprocess import flatten_sources
+
+SENTENCES = (
+    "The proposed method (PM) improves recall over the baseline.",
+    "As shown in Figure 3, the LSTM baseline degrades on long inputs.",
+    "We refer to Sec. 2 and \\ref{sec:method} for details.",
+    "Prior work \\cite{smith2020,doe2019} reports 10-20 percent gains.",
+    "Each run takes 5 ms on a 3 GHz machine with 16 GB of memory.",
+    "Eq. 4 defines the loss, see also \\eqref{eq:loss}.",
+)
+
+
+def synthetic_tex(size_bytes, seed=0):
+    rng = random.Random(seed)
+    lines = ["\\section{Introduction}\\label{sec:intro}"]
+    total = len(lines[0])
+    while total < size_bytes:
+        line = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 3)))
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+class LegacyLines:
+    def __init__(self, text):
+        self.text = text
+
+    def location(self, position):
+        return cross.location_from_index(self.text, position)
+
+
+def time_cross(size_bytes):
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "thesis.tex"
+        path.write_text(synthetic_tex(size_bytes), encoding="utf-8")
+        flattened = flatten_sources([path])
+        started = time.perf_counter()
+        cross.run_cross_pass(flattened["files"], flattened["index"])
+        return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross pass scaling on a synthetic .tex file")
+    parser.add_argument("--sizes", default="64,128,256,512", help="file sizes in KB")
+    parser.add_argument("--legacy", action="store_true", help="use location_from_index for every match")
+    args = parser.parse_args(argv)
+    if args.legacy:
+        cross.LineTable = LegacyLines
+    previous = None
+    print("%8s %10s %12s" % ("KB", "seconds", "x previous"))
+    for size in (int(item) for item in args.sizes.split(",")):
+        elapsed = time_cross(size * 1024)
+        ratio = elapsed / previous if previous else 0.0
+        print("%8d %10.3f %12.2f" % (size, elapsed, ratio))
+        previous = elapsed
+
+
+if __name__ == "__main__":
+    main()
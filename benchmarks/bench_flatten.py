@@ -0,0 +1,56 @@
+import argparse
+import random
+import time
+
+from pfread.preprocess.latex_flatten import clean_line, clean_lines
+
+FRAGMENTS = (
+    "The \\textbf{proposed} method improves on \\emph{prior \\textit{work}} by a wide margin.",
+    "See \\cite[p.~4]{smith2020} and Fig.~\\ref{fig:overview} for details. % reviewer note",
+    "\\begin{figure}[t] \\centering \\includegraphics[width=0.5\\linewidth]{overview.pdf}",
+    "We set $\\alpha = 0.5$ and report 95\\% confidence intervals.",
+    "\\section{Experimental \\texorpdfstring{Setup}{setup}}\\label{sec:setup}",
+)
+
+
+def synthetic_lines(size_bytes, nesting=0, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size_bytes:
+        line = rng.choice(FRAGMENTS)
+        if nesting:
+            line = "\\textbf{" * nesting + line + "}" * nesting
+        lines.append(line)
+        total += len(line) + 1
+    return lines
+
+
+def throughput(clean, lines):
+    size = sum(len(line) + 1 for line in lines) / (1024 * 1024)
+    started = time.perf_counter()
+    clean(lines)
+    return size / (time.perf_counter() - started)
+
+
+def legacy(lines):
+    return [clean_line(line) for line in lines]
+
+
+def streaming(lines):
+    return list(clean_lines(lines))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LaTeX flattening throughput")
+    parser.add_argument("--size", type=float, default=4.0, help="input size in MB")
+    parser.add_argument("--nesting", default="0,8,32", help="brace nesting depths to test")
+    args = parser.parse_args(argv)
+    print("%8s %14s %14s" % ("nesting", "legacy MB/s", "stream MB/s"))
+    for nesting in (int(item) for item in args.nesting.split(",")):
+        lines = synthetic_lines(int(args.size * 1024 * 1024), nesting)
+        print("%8d %14.2f %14.2f" % (nesting, throughput(legacy, lines), throughput(streaming, lines)))
+
+
+if __name__ == "__main__":
+    main()
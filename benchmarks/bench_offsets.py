@@ -0,0 +1,62 @@
+import argparse
+import random
+import time
+
+from pfread.utils.offsets import OffsetIndex
+
+WORDS = ("proof", "reading", "latex", "offset", "index", "lookup", "scaling", "theorem", "lemma", "figure")
+
+
+def build_index(size_bytes, seed=0):
+    rng = random.Random(seed)
+    index = OffsetIndex()
+    lines = []
+    total = 0
+    number = 0
+    while total < size_bytes:
+        number += 1
+        file_path = "chapter%02d.tex" % (number // 2000)
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+        index.extend_from_mapping(file_path, number, range(len(line)))
+        index.add_newline(file_path, number, len(line))
+        lines.append((file_path, number, len(line)))
+        total += len(line) + 1
+    return index, lines
+
+
+def linear_lookup(index, file_path, line, column):
+    for idx, entry in enumerate(index.entries):
+        if entry.file == file_path and entry.line == line and entry.column >= column:
+            return idx
+    return None
+
+
+def time_lookups(lookup, queries):
+    started = time.perf_counter()
+    for file_path, line, column in queries:
+        lookup(file_path, line, column)
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OffsetIndex lookup scaling")
+    parser.add_argument("--sizes", default="0.25,0.5,1,2", help="flattened sizes in MB")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--linear-queries", type=int, default=5)
+    args = parser.parse_args(argv)
+    rng = random.Random(1)
+    print("%8s %12s %12s %16s %16s" % ("MB", "entries", "index MB", "indexed us/op", "linear us/op"))
+    for size in (float(item) for item in args.sizes.split(",")):
+        index, lines = build_index(int(size * 1024 * 1024))
+        queries = []
+        for _ in range(args.queries):
+            file_path, number, length = rng.choice(lines)
+            queries.append((file_path, number, rng.randint(0, length)))
+        indexed = time_lookups(index._find_position, queries)
+        linear = time_lookups(lambda f, l, c: linear_lookup(index, f, l, c), queries[: args.linear_queries])
+        footprint = index.memory_footprint() / (1024 * 1024)
+        print("%8.2f %12d %12.2f %16.2f %16.2f" % (size, len(index), footprint, indexed * 1e6, linear * 1e6))
+
+
+if __name__ == "__main__":
+    main()
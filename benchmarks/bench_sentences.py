@@ -0,0 +1,109 @@
+import argparse
+import time
+
+from benchmarks.bench_cross import synthetic_tex
+from pfread.passes.sentences import split_sentences, trim_segment
+from pfread.preprocess.latex_flatten import flatten_content
+
+
+def legacy_split_sentences(text):
+    sentences = []
+    start = 0
+    braces = 0
+    brackets = 0
+    inline_math = False
+    display_math = 0
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if text.startswith("\\(", index):
+            inline_math = True
+            index += 2
+            continue
+        if text.startswith("\\)", index):
+            inline_math = False
+            index += 2
+            continue
+        if text.startswith("\\[", index):
+            display_math += 1
+            index += 2
+            continue
+        if text.startswith("\\]", index):
+            if display_math > 0:
+                display_math -= 1
+            index += 2
+            continue
+        if char == "$":
+            inline_math = not inline_math
+            index += 1
+            continue
+        if char == "{":
+            braces += 1
+        elif char == "}":
+            if braces > 0:
+                braces -= 1
+        elif char == "[":
+            brackets += 1
+        elif char == "]":
+            if brackets > 0:
+                brackets -= 1
+        boundary = False
+        if char in {".", "!", "?"} and not braces and not brackets and not inline_math and display_math == 0:
+            peek = index + 1
+            while peek < length and text[peek] in {'"', "'", ")", "]"}:
+                peek += 1
+            if peek >= length or text[peek].isspace():
+                boundary = True
+        if boundary:
+            segment = text[start:index + 1]
+            cleaned, offset_left, offset_right = trim_segment(segment)
+            if cleaned:
+                sentences.append(
+                    {
+                        "text": cleaned,
+                        "start": start + offset_left,
+                        "end": start + offset_right,
+                    }
+                )
+            start = index + 1
+        index += 1
+    if start < length:
+        segment = text[start:length]
+        cleaned, offset_left, offset_right = trim_segment(segment)
+        if cleaned:
+            sentences.append(
+                {
+                    "text": cleaned,
+                    "start": start + offset_left,
+                    "end": start + offset_right,
+                }
+            )
+    return sentences
+
+
+def throughput(split, text):
+    size = len(text) / (1024 * 1024)
+    started = time.perf_counter()
+    sentences = split(text)
+    return size / (time.perf_counter() - started), len(sentences)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentence splitter throughput")
+    parser.add_argument("--size", type=float, default=4.0, help="input size in MB")
+    args = parser.parse_args(argv)
+    text = flatten_content(synthetic_tex(int(args.size * 1024 * 1024), 0))["text"]
+    print("%-16s %10s %10s" % ("splitter", "MB/s", "sentences"))
+    splitters = (
+        ("legacy", legacy_split_sentences),
+        ("regex", lambda value: split_sentences(value, abbreviations=())),
+        ("regex+abbrev", split_sentences),
+    )
+    for name, split in splitters:
+        rate, count = throughput(split, text)
+        print("%-16s %10.2f %10d" % (name, rate, count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+import random
+from pathlib import Path
+
+WORDS = (
+    "the", "model", "results", "we", "observe", "that", "training", "improves", "with", "larger", "batches",
+    "and", "our", "analysis", "shows", "a", "consistent", "gain", "over", "prior", "methods", "on", "all",
+    "benchmarks", "while", "memory", "remains", "bounded", "by", "the", "input", "length", "in", "practice",
+    "this", "approach", "scales", "to", "long", "documents", "without", "additional", "tuning", "of",
+    "hyperparameters", "or", "architecture", "changes", "which", "simplifies", "deployment", "considerably",
+)
+ACRONYMS = (
+    ("graph neural network", "GNN"),
+    ("large language model", "LLM"),
+    ("mean squared error", "MSE"),
+    ("stochastic gradient descent", "SGD"),
+    ("convolutional neural network", "CNN"),
+    ("natural language processing", "NLP"),
+)
+INLINE_MATH = ("$x_{i}^{2}$", "$\\alpha = 0.5$", "$\\mathcal{O}(n \\log n)$", "$\\sum_{k=1}^{n} w_k$")
+DENSITIES = {"refs": 0.08, "cites": 0.12, "acronyms": 0.1, "math": 0.1}
+SENTENCES_PER_PARAGRAPH = (3, 7)
+PARAGRAPHS_PER_SECTION = 6
+
+
+class ProjectWriter:
+    def __init__(self, rng, densities, cite_keys):
+        self.rng = rng
+        self.densities = densities
+        self.cite_keys = cite_keys
+        self.labels = []
+        self.defined = set()
+        self.sections = 0
+        self.equations = 0
+
+    def chance(self, name):
+        return self.rng.random() < self.densities[name]
+
+    def sentence(self):
+        words = [self.rng.choice(WORDS) for _ in range(self.rng.randint(8, 22))]
+        if self.chance("acronyms"):
+            expansion, acronym = self.rng.choice(ACRONYMS)
+            if acronym in self.defined:
+                words.insert(self.rng.randrange(len(words)), acronym)
+            else:
+                self.defined.add(acronym)
+                words.insert(self.rng.randrange(len(words)), "%s (%s)" % (expansion, acronym))
+        if self.chance("math"):
+            words.insert(self.rng.randrange(len(words)), self.rng.choice(INLINE_MATH))
+        if self.labels and self.chance("refs"):
+            words.append("as shown in Section~\\ref{%s}" % self.rng.choice(self.labels))
+        if self.chance("cites"):
+            count = self.rng.randint(1, 3)
+            words.append("\\cite{%s}" % ",".join(self.rng.sample(self.cite_keys, count)))
+        words[0] = words[0].capitalize()
+        return " ".join(words) + "."
+
+    def paragraph(self):
+        count = self.rng.randint(*SENTENCES_PER_PARAGRAPH)
+        return " ".join(self.sentence() for _ in range(count))
+
+    def equation(self):
+        self.equations += 1
+        label = "eq:e%d" % self.equations
+        self.labels.append(label)
+        return "\\begin{equation}\n  \\label{%s}\n  y = \\sum_{i=1}^{n} x_i^2\n\\end{equation}" % label
+
+    def section(self):
+        self.sections += 1
+        label = "sec:s%d" % self.sections
+        self.labels.append(label)
+        return "\\section{Section %d}\\label{%s}" % (self.sections, label)
+
+    def body(self, size_bytes):
+        blocks = []
+        total = 0
+        while total < size_bytes:
+            if not blocks or len(blocks) % PARAGRAPHS_PER_SECTION == 0:
+                block = self.section()
+            elif self.chance("math"):
+                block = self.equation()
+            else:
+                block = self.paragraph()
+            blocks.append(block)
+            total += len(block) + 2
+        return "\n\n".join(blocks) + "\n"
+
+
+def include_tree(files, depth):
+    depth = max(1, min(depth, files))
+    levels = [[] for _ in range(depth)]
+    for number in range(files):
+        levels[number * depth // files].append(number)
+    parents = {number: None for number in levels[0]}
+    for level in range(1, depth):
+        for slot, number in enumerate(levels[level]):
+            parents[number] = levels[level - 1][slot % len(levels[level - 1])]
+    return [level for level, members in enumerate(levels) for _ in members], parents
+
+
+def generate_project(root, files=8, size_bytes=256 * 1024, depth=2, densities=None, seed=0):
+    root = Path(root)
+    rng = random.Random(seed)
+    densities = dict(DENSITIES, **(densities or {}))
+    cite_keys = ["key%03d" % number for number in range(64)]
+    writer = ProjectWriter(rng, densities, cite_keys)
+    levels, parents = include_tree(files, depth)
+    names = ["sections/level%d/part%03d" % (level, number) for number, level in enumerate(levels)]
+    children = {}
+    for number, parent in parents.items():
+        children.setdefault(parent, []).append(number)
+    paths = []
+    for number, name in enumerate(names):
+        body = writer.body(max(size_bytes // files, 1))
+        includes = "".join("\\input{%s}\n" % names[child] for child in sorted(children.get(number, [])))
+        path = root / (name + ".tex")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(body + includes, encoding="utf-8")
+        paths.append(path)
+    main_path = root / "main.tex"
+    main_path.write_text(
+        "\\documentclass{article}\n\\begin{document}\n"
+        + "".join("\\input{%s}\n" % names[child] for child in sorted(children.get(None, [])))
+        + "\\bibliography{references}\n\\end{document}\n",
+        encoding="utf-8",
+    )
+    bib_path = root / "references.bib"
+    bib_path.write_text(
+        "".join("@article{%s,\n  title={Entry %s},\n  year={2020}\n}\n" % (key, key) for key in cite_keys),
+        encoding="utf-8",
+    )
+    return {
+        "main": main_path,
+        "bib": bib_path,
+        "files": paths,
+        "bytes": sum(path.stat().st_size for path in paths),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic LaTeX project")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--size", type=float, default=256.0, help="total size in KB")
+    parser.add_argument("--depth", type=int, default=2, help="\\input nesting depth")
+    parser.add_argument("--seed", type=int, default=0)
+    for name, value in DENSITIES.items():
+        parser.add_argument("--%s" % name, type=float, default=value, help="per-sentence probability")
+    args = parser.parse_args(argv)
+    project = generate_project(
+        args.output,
+        files=args.files,
+        size_bytes=int(args.size * 1024),
+        depth=args.depth,
+        densities={name: getattr(args, name) for name in DENSITIES},
+        seed=args.seed,
+    )
+    print("%d files, %.1f KB, main %s" % (len(project["files"]), project["bytes"] / 1024, project["main"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import DENSITIES, generate_project
+from pfread.main import run_cli
+from pfread.passes.cross import build_label_index, run_cross_pass
+from pfread.passes.paragraphs import split_paragraphs
+from pfread.passes.sentences import split_sentences
+from pfread.preprocess import flatten_sources, resolve_document
+
+RESULTS_VERSION = 1
+PRESETS = {
+    "tiny": {"files": 2, "size_kb": 10, "depth": 1},
+    "small": {"files": 8, "size_kb": 256, "depth": 2},
+    "medium": {"files": 32, "size_kb": 4096, "depth": 3},
+    "large": {"files": 128, "size_kb": 51200, "depth": 4},
+}
+STAGES = (
+    "flatten_sources",
+    "split_sentences",
+    "split_paragraphs",
+    "build_label_index",
+    "run_cross_pass",
+    "run_cli",
+)
+TOLERANCE = 0.25
+MIN_DELTA = 0.005
+
+
+def time_stage(run, repeat):
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        runs.append(time.perf_counter() - started)
+    return runs
+
+
+def stage_runners(project, work_dir):
+    tex_files = resolve_document(project["main"])
+    state = {"flattened": flatten_sources(tex_files)}
+    counter = {"runs": 0}
+
+    def flatten():
+        state["flattened"] = flatten_sources(tex_files)
+
+    def end_to_end():
+        counter["runs"] += 1
+        out_dir = work_dir / ("run%d" % counter["runs"])
+        run_cli(
+            [
+                "--report",
+                str(out_dir / "report.html"),
+                "--json",
+                str(out_dir / "findings.json"),
+                "--project-dir",
+                str(project["main"].parent),
+                "--main",
+                str(project["main"]),
+                "--bib",
+                str(project["bib"]),
+                "--fake-llm",
+                "--no-cache",
+            ]
+        )
+
+    return {
+        "flatten_sources": flatten,
+        "split_sentences": lambda: split_sentences(state["flattened"]["text"]),
+        "split_paragraphs": lambda: split_paragraphs(state["flattened"]["text"]),
+        "build_label_index": lambda: build_label_index(state["flattened"]["files"]),
+        "run_cross_pass": lambda: run_cross_pass(
+            state["flattened"]["files"], state["flattened"]["index"], project["bib"]
+        ),
+        "run_cli": end_to_end,
+    }
+
+
+def run_suite(config, stages=STAGES, repeat=3):
+    with tempfile.TemporaryDirectory() as folder:
+        work_dir = Path(folder)
+        project = generate_project(
+            work_dir / "project",
+            files=config["files"],
+            size_bytes=config["size_kb"] * 1024,
+            depth=config["depth"],
+            densities=config["densities"],
+            seed=config["seed"],
+        )
+        runners = stage_runners(project, work_dir / "out")
+        megabytes = project["bytes"] / (1024 * 1024)
+        results = {}
+        for name in stages:
+            runs = time_stage(runners[name], repeat)
+            results[name] = {
+                "seconds": round(min(runs), 6),
+                "median": round(statistics.median(runs), 6),
+                "runs": [round(value, 6) for value in runs],
+                "mb_per_s": round(megabytes / min(runs), 3) if min(runs) else 0.0,
+            }
+        return {
+            "version": RESULTS_VERSION,
+            "corpus": dict(config, bytes=project["bytes"]),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stages": results,
+        }
+
+
+def compare(results, baseline, tolerance=TOLERANCE, min_delta=MIN_DELTA):
+    rows = []
+    for name, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if previous is None:
+            rows.append({"stage": name, "seconds": current["seconds"], "baseline": None, "ratio": None, "ok": True})
+            continue
+        ratio = current["seconds"] / previous["seconds"] if previous["seconds"] else 1.0
+        regressed = ratio > 1.0 + tolerance and current["seconds"] - previous["seconds"] > min_delta
+        rows.append(
+            {
+                "stage": name,
+                "seconds": current["seconds"],
+                "baseline": previous["seconds"],
+                "ratio": round(ratio, 3),
+                "ok": not regressed,
+            }
+        )
+    return rows
+
+
+def print_rows(rows):
+    print("%-20s %12s %12s %8s" % ("stage", "seconds", "baseline", "ratio"))
+    for row in rows:
+        baseline = "-" if row["baseline"] is None else "%.4f" % row["baseline"]
+        ratio = "-" if row["ratio"] is None else "%.2fx" % row["ratio"]
+        flag = "" if row["ok"] else "  REGRESSION"
+        print("%-20s %12.4f %12s %8s%s" % (row["stage"], row["seconds"], baseline, ratio, flag))
+
+
+def build_config(args):
+    config = dict(PRESETS[args.preset])
+    for key in ("files", "size_kb", "depth"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    config["densities"] = {name: getattr(args, name) for name in DENSITIES}
+    config["seed"] = args.seed
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="pfread benchmark suite on a synthetic LaTeX corpus")
+    parser.add_argument("--preset", choices=list(PRESETS), default="small")
+    parser.add_argument("--files", type=int, default=None)
+    parser.add_argument("--size-kb", type=int, default=None)
+    parser.add_argument("--depth", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    for name, value in DENSITIES.items():
+        parser.add_argument("--%s" % name, type=float, default=value, help="per-sentence probability")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=None, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=None, help="fail if slower than this results file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA, help="ignore slowdowns below this many seconds")
+    args = parser.parse_args(argv)
+    stages = [name.strip() for name in args.stages.split(",") if name.strip()]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        parser.error("unknown stages: %s" % ", ".join(unknown))
+    results = run_suite(build_config(args), stages, args.repeat)
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.baseline is None:
+        print(json.dumps(results, indent=2))
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("corpus") != results["corpus"]:
+        print("warning: baseline was recorded on a different corpus", file=sys.stderr)
+    rows = compare(results, baseline, args.tolerance, args.min_delta)
+    print_rows(rows)
+    return 0 if all(row["ok"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,47 +1,217 @@
 import json
+import os
+import threading
 import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
-from pfread.utils.telemetry import Telemetry
+from pfread.utils.cache import cache_key
+from pfread.utils.retry import PERMANENT, CircuitOpenError, DeadlineExceeded, RetryPolicy, classify_error
+from pfread.utils.telemetry import Telemetry, estimate_tokens
+
+
+def request_task(user):
+    try:
+        return json.loads(user).get("task") or "unknown"
+    except (ValueError, AttributeError):
+        return "unknown"
+
+
+def parse_retry_after(headers):
+    for name, scale in (("Retry-After-Ms", 0.001), ("Retry-After", 1.0)):
+        try:
+            return max(float(headers.get(name)) * scale, 0.0)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class LLMRequestError(RuntimeError):
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
 
 
 class LLMClient:
-    def __init__(self, model="gpt-5-nano", temperature=0.0, max_retries=2, fake=False, telemetry=None):
+    def __init__(
+        self,
+        model="gpt-5-nano",
+        temperature=0.0,
+        max_retries=2,
+        fake=False,
+        telemetry=None,
+        cache=None,
+        concurrency=1,
+        fake_latency=0.0,
+        simulator=None,
+        endpoint=None,
+        api_key=None,
+        timeout=60.0,
+        retry=None,
+    ):
         self.model = model
         self.temperature = temperature
         self.max_retries = max_retries
         self.fake = fake
         self.telemetry = telemetry or Telemetry()
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self._in_flight = threading.BoundedSemaphore(self.concurrency)
+        self.fake_latency = fake_latency
+        self.simulator = simulator
+        self.endpoint = endpoint
+        self.api_key = api_key if api_key is not None else os.environ.get("OPENAI_API_KEY")
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy(max_retries=max_retries)
+
+    def backend(self):
+        if self.fake:
+            return "fake"
+        if self.endpoint:
+            return "endpoint:" + self.endpoint.rstrip("/")
+        return "unconfigured"
 
     def complete_json(self, system, user, model=None, temperature=None, max_tokens=256):
+        with self.telemetry.span(request_task(user), "llm"):
+            return self._complete_json(system, user, model, temperature, max_tokens)
+
+    def _complete_json(self, system, user, model, temperature, max_tokens):
         current_model = model or self.model
         current_temperature = temperature if temperature is not None else self.temperature
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.backend(), current_model, system, user, current_temperature, max_tokens)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.telemetry.increment("cache_hits")
+                return cached
+            self.telemetry.increment("cache_misses")
+        policy = self.retry
+        expires = policy.expires()
         attempts = 0
-        last_error = None
-        while attempts <= self.max_retries:
+        while True:
+            remaining = policy.remaining(expires)
+            if remaining is not None and remaining <= 0:
+                self.telemetry.increment("llm_deadline_exceeded")
+                raise DeadlineExceeded(f"LLM request failed: deadline reached before attempt {attempts + 1}")
             try:
-                if not self.fake:
-                    raise RuntimeError("Real LLM mode is not configured")
-                response = self._fake_response(system, user, current_model, current_temperature, max_tokens)
+                policy.breaker.before_call()
+                with self._in_flight, self.telemetry.span("attempt", "llm.attempt", attempt=attempts):
+                    if self.fake:
+                        response = self._fake_response(system, user, current_model, current_temperature, max_tokens)
+                        usage = {}
+                    elif self.endpoint:
+                        timeout = self.timeout if remaining is None else min(self.timeout, remaining)
+                        response, usage = self._http_response(
+                            system, user, current_model, current_temperature, max_tokens, timeout
+                        )
+                    else:
+                        raise RuntimeError("Real LLM mode is not configured")
                 payload = json.loads(json.dumps(response))
-                prompt_tokens = len(user.split())
-                completion_tokens = len(json.dumps(payload).split())
+                policy.breaker.record_success()
+                prompt_tokens = usage.get("prompt_tokens", estimate_tokens(user))
+                completion_tokens = usage.get("completion_tokens", estimate_tokens(json.dumps(payload)))
                 self.telemetry.record_completion(current_model, prompt_tokens, completion_tokens)
+                if key is not None:
+                    self.cache.put(key, payload)
                 return payload
             except Exception as error:  # noqa: BLE001
-                last_error = error
-                time.sleep(0.05 * (2 ** attempts))
+                kind = classify_error(error)
+                self.telemetry.increment("llm_errors")
+                self.telemetry.increment("llm_errors_" + kind)
+                if kind == PERMANENT:
+                    policy.breaker.record_success()
+                elif not isinstance(error, CircuitOpenError) and policy.breaker.record_failure():
+                    self.telemetry.increment("llm_circuit_opened")
+                if isinstance(error, CircuitOpenError) and attempts >= policy.max_retries:
+                    raise
+                if kind == PERMANENT or attempts >= policy.max_retries:
+                    raise RuntimeError(f"LLM request failed: {error}") from error
+                delay = policy.delay(error, attempts)
+                remaining = policy.remaining(expires)
+                if remaining is not None and delay >= remaining:
+                    self.telemetry.increment("llm_deadline_exceeded")
+                    raise DeadlineExceeded(
+                        f"LLM request failed: deadline reached after {attempts + 1} attempts: {error}"
+                    ) from error
+                with self.telemetry.span("backoff", "llm.attempt", attempt=attempts, error=kind):
+                    policy.sleep(delay)
+                self.telemetry.increment("llm_retries")
+                self.telemetry.increment("llm_retry_sleep_ms", int(delay * 1000))
                 attempts += 1
-        raise RuntimeError(f"LLM request failed: {last_error}")
+
+    def complete_json_many(
+        self, system, users, model=None, temperature=None, max_tokens=256, return_exceptions=False
+    ):
+        users = list(users)
+
+        def call(user):
+            try:
+                return self.complete_json(system, user, model, temperature, max_tokens)
+            except Exception as error:  # noqa: BLE001
+                if not return_exceptions:
+                    raise
+                return error
+
+        if self.concurrency == 1 or len(users) < 2:
+            return [call(user) for user in users]
+        workers = min(self.concurrency, len(users))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(call, user) for user in users]
+            return [future.result() for future in futures]
+
+    def _http_response(self, system, user, model, temperature, max_tokens, timeout=None):
+        body = {
+            "model": model,
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"},
+        }
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = "Bearer " + self.api_key
+        request = urllib.request.Request(
+            self.endpoint.rstrip("/") + "/chat/completions",
+            data=json.dumps(body).encode("utf-8"),
+            headers=headers,
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                data = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as error:
+            raise LLMRequestError(
+                f"LLM endpoint returned HTTP {error.code}",
+                status=error.code,
+                retry_after=parse_retry_after(error.headers),
+            ) from error
+        content = data["choices"][0]["message"]["content"]
+        return json.loads(content), data.get("usage") or {}
 
     def _fake_response(self, system, user, model, temperature, max_tokens):
+        answer = self.fake_answer(user)
+        if self.simulator is not None:
+            self.simulator.call(user, estimate_tokens(user), estimate_tokens(json.dumps(answer)))
+        elif self.fake_latency > 0:
+            time.sleep(self.fake_latency)
+        return answer
+
+    def fake_answer(self, user):
         data = json.loads(user)
         task = data.get("task")
         if task == "proofread_sentence":
             return self._fake_sentence(data)
+        if task == "proofread_sentence_batch":
+            return self._fake_sentence_batch(data)
         if task == "cross_check_ambiguity":
             return {"status": "ok"}
         if task == "paragraph_diagnose":
             return self._fake_paragraph(data)
+        if task == "proofread_paragraph":
+            return self._fake_fused(data)
         if task == "paper_review":
             return self._fake_review(data)
         return {}
@@ -68,6 +238,14 @@ class LLMClient:
             }
         return {"status": "ok"}
 
+    def _fake_sentence_batch(self, data):
+        results = []
+        for item in data.get("sentences", []):
+            result = {"id": item.get("id")}
+            result.update(self._fake_sentence({"sentence": item.get("text", "")}))
+            results.append(result)
+        return {"results": results}
+
     def _fake_paragraph(self, data):
         paragraph = data.get("paragraph", "")
         issues = []
@@ -111,6 +289,12 @@ class LLMClient:
             )
         return issues
 
+    def _fake_fused(self, data):
+        return {
+            "sentences": self._fake_sentence_batch(data)["results"],
+            "diagnostics": self._fake_paragraph(data),
+        }
+
     def _fake_review(self, data):
         skeleton = data.get("skeleton", "")
         sections = []
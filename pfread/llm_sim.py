@@ -0,0 +1,244 @@
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pfread.llm import LLMClient, LLMRequestError
+from pfread.utils.telemetry import estimate_tokens
+
+DEFAULT_PROFILE = {
+    "latency": "fixed:0",
+    "errors": 0.0,
+    "rate_limits": 0.0,
+    "timeouts": 0.0,
+    "retry_after": 1.0,
+    "hang": 30.0,
+    "tps": 0.0,
+    "tpm": 0,
+    "seed": 0,
+}
+LATENCY_KINDS = {"fixed": 1, "uniform": 2, "lognormal": 2, "exponential": 1}
+QUOTA_WINDOW = 60.0
+
+
+def parse_latency(spec):
+    kind, _, rest = spec.partition(":")
+    values = [float(item) for item in rest.split(":") if item]
+    if kind not in LATENCY_KINDS or len(values) != LATENCY_KINDS[kind]:
+        raise ValueError(f"Invalid latency distribution '{spec}'")
+    return kind, values
+
+
+def parse_profile(spec=""):
+    profile = dict(DEFAULT_PROFILE)
+    for item in (part.strip() for part in spec.split(",")):
+        if not item:
+            continue
+        name, _, value = item.partition("=")
+        if name not in DEFAULT_PROFILE or not value:
+            raise ValueError(f"Invalid simulation setting '{item}'")
+        default = DEFAULT_PROFILE[name]
+        profile[name] = value if isinstance(default, str) else type(default)(value)
+    parse_latency(profile["latency"])
+    return profile
+
+
+def sample_latency(rng, spec):
+    kind, values = parse_latency(spec)
+    if kind == "fixed":
+        return values[0]
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return values[0] * math.exp(rng.gauss(0.0, values[1]))
+    return rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+
+
+class LLMSimulator:
+    def __init__(self, profile=None, sleep=time.sleep, clock=time.monotonic):
+        self.profile = profile or parse_profile()
+        self.sleep = sleep
+        self.clock = clock
+        self.seen = {}
+        self.window = deque()
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def _rng(self, user):
+        digest = hashlib.sha1(user.encode("utf-8")).hexdigest()
+        with self._lock:
+            count = self.seen.get(digest, 0)
+            self.seen[digest] = count + 1
+        return random.Random("%s:%s:%d" % (self.profile["seed"], digest, count))
+
+    def _reserve(self, tokens):
+        quota = self.profile["tpm"]
+        if not quota:
+            return None
+        with self._lock:
+            now = self.clock()
+            while self.window and self.window[0][0] <= now - QUOTA_WINDOW:
+                self.used -= self.window.popleft()[1]
+            if self.used + tokens <= quota:
+                self.window.append((now, tokens))
+                self.used += tokens
+                return None
+            freed = self.used
+            for stamp, amount in self.window:
+                freed -= amount
+                if freed + tokens <= quota:
+                    return max(stamp + QUOTA_WINDOW - now, 0.0)
+            return QUOTA_WINDOW
+
+    def plan(self, user, prompt_tokens, completion_tokens):
+        rng = self._rng(user)
+        latency = sample_latency(rng, self.profile["latency"])
+        roll = rng.random()
+        plan = {"outcome": "ok", "latency": latency, "retry_after": None, "generation": 0.0}
+        if roll < self.profile["errors"]:
+            plan["outcome"] = "error"
+        elif roll < self.profile["errors"] + self.profile["rate_limits"]:
+            plan["outcome"] = "rate_limited"
+            plan["retry_after"] = self.profile["retry_after"]
+        elif roll < self.profile["errors"] + self.profile["rate_limits"] + self.profile["timeouts"]:
+            plan["outcome"] = "timeout"
+        else:
+            wait = self._reserve(prompt_tokens + completion_tokens)
+            if wait is not None:
+                plan["outcome"] = "rate_limited"
+                plan["retry_after"] = wait
+            elif self.profile["tps"] > 0:
+                plan["generation"] = completion_tokens / self.profile["tps"]
+        return plan
+
+    def call(self, user, prompt_tokens, completion_tokens):
+        plan = self.plan(user, prompt_tokens, completion_tokens)
+        self.sleep(plan["latency"])
+        if plan["outcome"] == "error":
+            raise LLMRequestError("Simulated server error", status=500)
+        if plan["outcome"] == "rate_limited":
+            raise LLMRequestError("Simulated rate limit", status=429, retry_after=plan["retry_after"])
+        if plan["outcome"] == "timeout":
+            self.sleep(self.profile["hang"])
+            raise TimeoutError("Simulated request timeout")
+        self.sleep(plan["generation"])
+        return plan
+
+
+class SimulatedLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message, kind, headers=None):
+        self.send_json(status, {"error": {"message": message, "type": kind}}, headers)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error_json(404, "Unknown endpoint", "invalid_request_error")
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8"))
+        user = "".join(message["content"] for message in request.get("messages", []) if message["role"] == "user")
+        try:
+            answer = self.server.responder.fake_answer(user)
+        except ValueError:
+            self.send_error_json(400, "User message is not a JSON task", "invalid_request_error")
+            return
+        content = json.dumps(answer)
+        usage = {"prompt_tokens": estimate_tokens(user), "completion_tokens": estimate_tokens(content)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        simulator = self.server.simulator
+        plan = simulator.plan(user, usage["prompt_tokens"], usage["completion_tokens"])
+        simulator.sleep(plan["latency"])
+        if plan["outcome"] == "error":
+            self.send_error_json(500, "Simulated server error", "server_error")
+        elif plan["outcome"] == "rate_limited":
+            headers = {
+                "Retry-After": str(math.ceil(plan["retry_after"])),
+                "Retry-After-Ms": str(int(plan["retry_after"] * 1000)),
+            }
+            self.send_error_json(429, "Simulated rate limit", "rate_limit_exceeded", headers)
+        elif plan["outcome"] == "timeout":
+            simulator.sleep(simulator.profile["hang"])
+            self.send_error_json(504, "Simulated gateway timeout", "timeout")
+        elif request.get("stream"):
+            self.stream_completion(content, plan)
+        else:
+            simulator.sleep(plan["generation"])
+            self.send_json(200, completion_payload(request, content, usage))
+
+    def stream_completion(self, content, plan):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        pieces = content.split(" ")
+        delay = plan["generation"] / len(pieces)
+        for position, piece in enumerate(pieces):
+            self.server.simulator.sleep(delay)
+            delta = piece if position == 0 else " " + piece
+            chunk = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": delta}}]}
+            self.wfile.write(("data: %s\n\n" % json.dumps(chunk)).encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+def completion_payload(request, content, usage):
+    return {
+        "object": "chat.completion",
+        "model": request.get("model", ""),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": usage,
+    }
+
+
+def make_server(profile=None, host="127.0.0.1", port=0):
+    server = ThreadingHTTPServer((host, port), SimulatedLLMHandler)
+    server.daemon_threads = True
+    server.simulator = LLMSimulator(profile)
+    server.responder = LLMClient(fake=True)
+    return server
+
+
+def start_server(profile=None, host="127.0.0.1", port=0):
+    server = make_server(profile, host, port)
+    thread = threading.Thread(target=server.serve_forever, name="pfread-llm-sim", daemon=True)
+    thread.start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stand-in server backed by the fake LLM")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--simulate", default="", help="comma-separated simulation settings")
+    args = parser.parse_args(argv)
+    server = make_server(parse_profile(args.simulate), args.host, args.port)
+    print("Serving simulated LLM on http://%s:%d/v1" % (args.host, server.server_port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,28 @@ import time
 from pathlib import Path
 
 from pfread.llm import LLMClient
-from pfread.passes import run_cross_pass, run_paragraph_pass, run_review_pass, run_sentences_pass
-from pfread.preprocess import flatten_sources
+from pfread.passes import (
+    prompt_signature,
+    run_cross_pass,
+    run_fused_pass,
+    run_paragraph_pass,
+    run_review_pass,
+    run_sentences_pass,
+)
+from pfread.passes.triage import TRIAGE_LEVELS
+from pfread.preprocess import FlattenCache, flatten_sources, resolve_document
 from pfread.utils import io
-from pfread.utils.schema import IssueIdGenerator, findings_json
+from pfread.utils.cache import ResponseCache
+from pfread.utils.findings import FindingsSink, FindingsView, iter_findings, write_findings_json
+from pfread.utils.incremental import UnitState, load_state, save_state, state_path_for
+from pfread.utils.profiler import StageProfiler, profile_stage
+from pfread.utils.report_shards import write_report_shards
+from pfread.utils.retry import BREAKER_COOLDOWN, BREAKER_THRESHOLD, CircuitBreaker, RetryPolicy
+from pfread.utils.scheduler import run_pass_graph
 from pfread.utils.telemetry import Telemetry
 
 PASS_NAMES = ("typo", "cross", "paragraph", "review")
+ISSUE_ORDER = ("typo", "cross", "paragraph")
 
 
 def parse_mode(value):
@@ -41,11 +56,34 @@ def build_parser():
     parser.add_argument("--json", dest="json_path", type=Path, required=True)
     parser.add_argument("--diff", dest="diff_path", type=Path, required=False)
     parser.add_argument("--project-dir", type=Path, default=Path("."))
+    parser.add_argument("--main", type=Path, default=None)
     parser.add_argument("--bib", type=Path, default=None)
     parser.add_argument("--model", default="gpt-5-nano")
     parser.add_argument("--temperature", type=float, default=0.0)
     parser.add_argument("--fake-llm", action="store_true")
     parser.add_argument("--venue", default="")
+    parser.add_argument("--cache-dir", type=Path, default=None)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fake-latency", type=float, default=0.0)
+    parser.add_argument("--batch-tokens", type=int, default=0)
+    parser.add_argument("--cross-workers", type=int, default=1)
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--triage", choices=list(TRIAGE_LEVELS), default="off")
+    parser.add_argument("--paragraph-tokens", type=int, default=0)
+    parser.add_argument("--fuse", action="store_true")
+    parser.add_argument("--pass-workers", type=int, default=4)
+    parser.add_argument("--jsonl-only", action="store_true")
+    parser.add_argument("--trace", type=Path, default=None)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--simulate", default=None)
+    parser.add_argument("--llm-endpoint", default=None)
+    parser.add_argument("--llm-timeout", type=float, default=60.0)
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--call-deadline", type=float, default=None)
+    parser.add_argument("--run-deadline", type=float, default=None)
+    parser.add_argument("--breaker-threshold", type=int, default=BREAKER_THRESHOLD)
+    parser.add_argument("--breaker-cooldown", type=float, default=BREAKER_COOLDOWN)
     return parser
 
 
@@ -68,81 +106,204 @@ def load_report_template():
 def run_cli(argv=None):
     parser = build_parser()
     args = parser.parse_args(argv)
+    if args.fuse and (args.batch_tokens or args.paragraph_tokens):
+        parser.error("--fuse cannot be combined with --batch-tokens or --paragraph-tokens")
+    if args.simulate is not None and not args.fake_llm:
+        parser.error("--simulate requires --fake-llm")
     telemetry = Telemetry()
-    generator = IssueIdGenerator()
+    profiler = None
+    if args.profile:
+        profiler = StageProfiler()
+        profiler.start()
+    cache_dir = None
+    cache = None
+    flatten_cache = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or args.report.parent / ".pfread_cache"
+        if args.simulate is None and not args.fake_latency:
+            cache = ResponseCache(cache_dir)
+        flatten_cache = FlattenCache(cache_dir / "flatten")
+    simulator = None
+    if args.simulate is not None:
+        from pfread.llm_sim import LLMSimulator, parse_profile
+
+        try:
+            simulator = LLMSimulator(parse_profile(args.simulate))
+        except ValueError as error:
+            parser.error(str(error))
+    retry = RetryPolicy(
+        max_retries=args.max_retries,
+        call_deadline=args.call_deadline,
+        run_deadline=args.run_deadline,
+        breaker=CircuitBreaker(args.breaker_threshold, args.breaker_cooldown),
+    )
     llm_client = LLMClient(
         model=args.model,
         temperature=args.temperature,
+        max_retries=args.max_retries,
         fake=args.fake_llm,
         telemetry=telemetry,
+        cache=cache,
+        concurrency=args.concurrency,
+        fake_latency=args.fake_latency,
+        simulator=simulator,
+        endpoint=args.llm_endpoint,
+        timeout=args.llm_timeout,
+        retry=retry,
     )
-    tex_files = io.collect_tex_files(args.project_dir)
+    if args.main is not None:
+        main_path = args.main if args.main.is_absolute() else args.project_dir / args.main
+        if not main_path.is_file():
+            raise SystemExit(f"Main document {main_path} not found")
+        graph_cache = cache_dir / "graph.json" if cache_dir is not None else None
+        with telemetry.span("resolve_document"):
+            tex_files = resolve_document(main_path, graph_cache)
+    else:
+        tex_files = io.collect_tex_files(args.project_dir)
     if not tex_files:
         raise SystemExit("No .tex files found in project directory")
-    flattened = flatten_sources(tex_files)
+    with telemetry.span("flatten"), profile_stage(profiler, "flatten"):
+        flattened = flatten_sources(tex_files, flatten_cache)
     text = flattened["text"]
     offset_index = flattened["index"]
     file_records = flattened["files"]
     files_meta = [{"path": item["path"], "sha": item["sha"]} for item in file_records]
-    issues = []
-    diff_text = ""
-
-    if "typo" in args.mode:
-        telemetry.start_timer("typo")
-        typo_issues, edits, diff_text = run_sentences_pass(text, offset_index, llm_client, generator)
-        telemetry.stop_timer("typo")
-        issues.extend(typo_issues)
-        if args.diff_path and diff_text:
-            io.write_text(args.diff_path, diff_text)
-        elif args.diff_path:
-            io.write_text(args.diff_path, "")
+    state_path = state_path_for(args.json_path)
+    if args.incremental:
+        state = load_state(state_path, args.model, llm_client.backend(), prompt_signature())
+    else:
+        state = UnitState(args.model, backend=llm_client.backend(), prompts=prompt_signature())
+    sink = FindingsSink(args.json_path.with_suffix(".jsonl"), ISSUE_ORDER)
+
+    def profiled(name, run):
+        def task(results):
+            with profile_stage(profiler, name):
+                return run(results)
+
+        return task
+
+    def spooled(name, run):
+        def task(results):
+            return run(results, sink.spool(name))
+
+        return profiled(name, task)
+
+    def typo_task(results, spool):
+        _, _, diff_text = run_sentences_pass(
+            text, offset_index, llm_client, batch_tokens=args.batch_tokens, state=state, triage=args.triage, sink=spool
+        )
+        return diff_text
+
+    def paragraph_task(results, spool):
+        run_paragraph_pass(text, offset_index, llm_client, state=state, token_budget=args.paragraph_tokens, sink=spool)
+
+    def cross_task(results, spool):
+        return run_cross_pass(
+            file_records, offset_index, args.bib, workers=args.cross_workers, telemetry=telemetry, sink=spool
+        )[1]
 
+    fused = args.fuse and "typo" in args.mode and "paragraph" in args.mode
+    tasks = []
+    if fused:
+        tasks.append(
+            (
+                "fused",
+                [],
+                profiled(
+                    "fused",
+                    lambda results: run_fused_pass(
+                        text,
+                        offset_index,
+                        llm_client,
+                        state=state,
+                        triage=args.triage,
+                        typo_sink=sink.spool("typo"),
+                        paragraph_sink=sink.spool("paragraph"),
+                    ),
+                ),
+            )
+        )
+        tasks.append(("typo", ["fused"], profiled("typo", lambda results: results["fused"][3])))
+    else:
+        if "typo" in args.mode:
+            tasks.append(("typo", [], spooled("typo", typo_task)))
+        if "paragraph" in args.mode:
+            tasks.append(("paragraph", [], spooled("paragraph", paragraph_task)))
+    if "cross" in args.mode:
+        tasks.append(("cross", [], spooled("cross", cross_task)))
+    if "review" in args.mode:
+        tasks.append(
+            ("review", [], profiled("review", lambda results: run_review_pass(file_records, llm_client, args.venue)))
+        )
+    pass_workers = 1 if profiler is not None else args.pass_workers
+    results = run_pass_graph(tasks, telemetry, workers=pass_workers)
+    with telemetry.span("write_jsonl"), profile_stage(profiler, "write_jsonl"):
+        issue_count = sink.close()
+
+    diff_text = results.get("typo") or ""
+    if "typo" in args.mode and args.diff_path:
+        io.write_text(args.diff_path, diff_text)
     if "cross" in args.mode:
-        telemetry.start_timer("cross")
-        cross_issues, label_index = run_cross_pass(file_records, offset_index, args.bib, generator)
-        telemetry.stop_timer("cross")
-        issues.extend(cross_issues)
         label_path = args.report.parent / "label_index.json"
-        label_payload = {key: value for key, value in label_index.items()}
+        label_payload = {key: value for key, value in results["cross"].items()}
         io.write_json(label_path, label_payload)
-
-    if "paragraph" in args.mode:
-        telemetry.start_timer("paragraph")
-        paragraph_issues = run_paragraph_pass(text, offset_index, llm_client, generator)
-        telemetry.stop_timer("paragraph")
-        issues.extend(paragraph_issues)
-
     review = {"summary": "", "strengths": [], "weaknesses": [], "top_fixes": [], "missing_refs": []}
     if "review" in args.mode:
-        telemetry.start_timer("review")
-        review = run_review_pass(file_records, llm_client, args.venue)
-        telemetry.stop_timer("review")
+        review = results["review"]
 
     timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    summary = telemetry.summary()
     meta = {
         "run_id": f"pfread-{int(time.time())}",
-        "model": telemetry.summary().get("model", args.model),
-        "tokens": telemetry.summary().get("tokens", 0),
-        "cost_usd": telemetry.summary().get("cost_usd", 0.0),
+        "model": summary.get("model") or args.model,
+        "tokens": summary.get("tokens", 0),
+        "cost_usd": summary.get("cost_usd", 0.0),
+        "cache_hits": summary["cache"]["hits"],
         "timestamp": timestamp,
     }
-    json_text = findings_json(meta, files_meta, issues, review)
-    io.write_text(args.json_path, json_text)
+    if not args.jsonl_only:
+        with telemetry.span("write_findings_json"), profile_stage(profiler, "write_findings_json"):
+            write_findings_json(args.json_path, meta, files_meta, iter_findings(sink.path), review)
+    save_state(state_path, state)
 
+    with telemetry.span("write_report"), profile_stage(profiler, "write_report"):
+        write_report_shards(args.report.parent, meta, files_meta, iter_findings(sink.path), review)
     report_html = load_report_template()
     io.write_text(args.report, report_html)
     copy_report_assets(args.report)
 
     metadata_path = args.report.parent / "metadata.json"
     metadata = telemetry.summary()
+    metadata["model"] = metadata["model"] or args.model
     metadata["timestamp"] = timestamp
+    metadata["offset_index_bytes"] = offset_index.memory_footprint()
+    metadata["incremental"] = {
+        "enabled": args.incremental,
+        "reused": state.reused,
+        "checked": state.checked,
+        "discarded": state.discarded,
+    }
+    if flatten_cache is not None:
+        metadata["flatten_cache"] = {"hits": flatten_cache.hits, "misses": flatten_cache.misses}
+    if profiler is not None:
+        profiler.stop()
+        metadata["profile"] = profiler.write(args.report.parent / "profile.json")
     io.write_json(metadata_path, metadata)
+    if args.trace is not None:
+        telemetry.write_trace(args.trace)
 
     if "typo" not in args.mode and args.diff_path:
         io.write_text(args.diff_path, diff_text)
 
+    if cache is not None:
+        cache.close()
+    if flatten_cache is not None:
+        flatten_cache.close()
+
     return {
-        "issues": issues,
+        "issues": FindingsView(sink.path, issue_count),
+        "issue_count": issue_count,
+        "findings": sink.path,
         "review": review,
         "meta": meta,
     }
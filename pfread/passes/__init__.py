@@ -1,11 +1,34 @@
+import hashlib
+import json
+
+from . import fused, paragraphs, sentences
 from .sentences import run_sentences_pass
 from .cross import run_cross_pass
 from .paragraphs import run_paragraph_pass
 from .review import run_review_pass
+from .fused import run_fused_pass
+
+
+def prompt_signature():
+    material = json.dumps(
+        [
+            sentences.SYSTEM_PROMPT,
+            sentences.SENTENCE_SCHEMA,
+            paragraphs.SYSTEM_PROMPT,
+            paragraphs.PARAGRAPH_STYLE,
+            paragraphs.PARAGRAPH_SCHEMA,
+            fused.SYSTEM_PROMPT,
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()[:12]
+
 
 __all__ = [
     "run_sentences_pass",
     "run_cross_pass",
     "run_paragraph_pass",
     "run_review_pass",
+    "run_fused_pass",
+    "prompt_signature",
 ]
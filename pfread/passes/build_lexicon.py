@@ -0,0 +1,58 @@
+import argparse
+import gzip
+import hashlib
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+from pfread.passes.lexicon import ERROR_RATE, LEXICON_PATH, build_lexicon
+
+SOURCE_PACKAGE = "pyspellchecker==0.9.1"
+SOURCE_RESOURCE = "resources/en.json.gz"
+SOURCE_SHA256 = "2474a48af86fd81dccea9edd0bba6cd36dd2ecedc0ae217cefcb233bba28613c"
+
+
+def default_source():
+    spec = importlib.util.find_spec("spellchecker")
+    if spec is None or spec.origin is None:
+        return None
+    return Path(spec.origin).parent / SOURCE_RESOURCE
+
+
+def read_words(path):
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        if path.name.endswith((".json", ".json.gz")):
+            return list(json.load(handle))
+        return [line.strip() for line in handle]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the Bloom-filter lexicon used by sentence triage")
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        type=Path,
+        help="word lists: one word per line, or JSON word maps (default: the bundled lexicon's %s source)"
+        % SOURCE_PACKAGE,
+    )
+    parser.add_argument("--output", type=Path, default=LEXICON_PATH)
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE)
+    args = parser.parse_args(argv)
+    if not args.sources:
+        source = default_source()
+        if source is None:
+            parser.error("no word lists given and %s is not installed" % SOURCE_PACKAGE)
+        if hashlib.sha256(source.read_bytes()).hexdigest() != SOURCE_SHA256:
+            print("warning: %s differs from the %s list; the filter will not match" % (source, SOURCE_PACKAGE),
+                  file=sys.stderr)
+        args.sources = [source]
+    words = [word for source in args.sources for word in read_words(source)]
+    bloom = build_lexicon(words, args.output, args.error_rate)
+    print("%d words, %d bits, %d hashes -> %s" % (len(set(words)), bloom.size, bloom.hashes, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,27 @@
+import multiprocessing
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from pfread.utils.schema import Issue, IssueIdGenerator, Span, validate_issue
+from pfread.utils.offsets import LineTable
+from pfread.utils.scanner import MultiPatternScanner
+from pfread.utils.schema import Issue, Span, assign_stable_ids, validate_issue
+from pfread.utils.telemetry import stage
 
 LABEL_PATTERN = re.compile(r"\\label\{([^}]+)\}")
 REF_PATTERN = re.compile(r"\\(ref|eqref|autoref)\{([^}]+)\}")
 CITE_PATTERN = re.compile(r"\\cite\{([^}]+)\}")
 CAPTION_PATTERN = re.compile(r"\\caption\{([^}]*)\}")
 SECTION_PATTERN = re.compile(r"\\(section|subsection|subsubsection)\{([^}]*)\}")
+ACRONYM_DEFINITION_PATTERN = re.compile(r"([A-Za-z][^()]{2,}?)\s*\(([A-Z]{2,})\)")
+ACRONYM_PAREN_PATTERN = re.compile(r"\(([A-Z]{2,})\)")
+ACRONYM_PATTERN = re.compile(r"\b([A-Z]{2,})\b")
+LETTER_PATTERN = re.compile(r"[A-Za-z]")
+RANGE_PATTERN = re.compile(r"\b\d+-\d+\b")
+UNIT_PATTERN = re.compile(r"(\d)\s+(cm|mm|km|m|s|ms|kg|g|hz|%)", re.IGNORECASE)
+
+
+PARALLEL_MIN_FILES = 8
 
 
 STYLE_LABELS = {
@@ -15,6 +29,13 @@ STYLE_LABELS = {
     "section": ("Sec.", "Section"),
     "equation": ("Eq.", "Equation"),
 }
+STYLE_PATTERNS = {
+    label_type: (
+        re.compile(r"\b(%s|%s)" % (re.escape(short), long_form)),
+        re.compile(re.escape(short) + r"\s+[0-9]"),
+    )
+    for label_type, (short, long_form) in STYLE_LABELS.items()
+}
 
 
 def location_from_index(text, position):
@@ -40,21 +61,24 @@ def infer_label_type(context):
     return "general"
 
 
-def build_label_index(files):
+def build_label_index(files, line_tables=None):
     index = {}
-    for record in files:
+    for position, record in enumerate(files):
         path = record["path"]
         text = record["text"]
+        lines = line_tables[position] if line_tables else LineTable(text)
         for match in LABEL_PATTERN.finditer(text):
-            key = match.group(1)
-            line, _ = location_from_index(text, match.start())
-            start_context = max(0, match.start() - 200)
-            context = text[start_context:match.start()]
-            label_type = infer_label_type(context)
-            index[key] = {"file": path, "line": line, "type": label_type}
+            index[match.group(1)] = label_entry(path, text, lines, match)
     return index
 
 
+def label_entry(path, text, lines, match):
+    line, _ = lines.location(match.start())
+    start_context = max(0, match.start() - 200)
+    context = text[start_context:match.start()]
+    return {"file": path, "line": line, "type": infer_label_type(context)}
+
+
 def parse_bib_keys(bib_path):
     if not bib_path:
         return set()
@@ -68,271 +92,401 @@ def parse_bib_keys(bib_path):
     return keys
 
 
-def run_cross_pass(files, offset_index, bib_path=None, issue_id=None):
-    generator = issue_id or IssueIdGenerator()
-    issues = []
-    label_index = build_label_index(files)
-    bib_keys = parse_bib_keys(bib_path)
-    used_citations = set()
+class CrossContext:
+    def __init__(self, record, offset_index, lines=None, label_index=None, bib_keys=None, used_citations=None):
+        self.record = record
+        self.path = record["path"]
+        self.text = record["text"]
+        self.offset_index = offset_index
+        self.lines = lines or LineTable(self.text)
+        self.label_index = label_index if label_index is not None else {}
+        self.bib_keys = bib_keys if bib_keys is not None else set()
+        self.used_citations = used_citations if used_citations is not None else set()
+        self.labels = []
 
-    for record in files:
-        path = record["path"]
-        text = record["text"]
-        for match in REF_PATTERN.finditer(text):
+    def issue(self, position, length, issue_type, severity, excerpt, suggestion, explanation):
+        line, column = self.lines.location(position)
+        span = self.offset_index.global_range(self.path, line, column, length)
+        if span is None:
+            start = 0
+            end = 0
+        else:
+            start, end = span
+        issue = Issue(
+            id="",
+            phase="cross",
+            type=issue_type,
+            severity=severity,
+            span=Span(file=self.path, start=start, end=end, line=line),
+            excerpt=excerpt,
+            suggestion=suggestion,
+            explanation=explanation,
+            autofix="manual",
+        )
+        validate_issue(issue)
+        return issue
+
+
+def setup_label_check(context, scanner):
+    def on_label(match):
+        context.labels.append((match.group(1), label_entry(context.path, context.text, context.lines, match)))
+
+    scanner.register(LABEL_PATTERN, on_label, first=r"\\")
+    return lambda: []
+
+
+def setup_ref_check(context, scanner):
+    refs = []
+    scanner.register(REF_PATTERN, refs.append, first=r"\\")
+
+    def finish():
+        issues = []
+        for match in refs:
             command = match.group(1)
             key = match.group(2)
-            line, column = location_from_index(text, match.start())
-            span = offset_index.global_range(path, line, column, len(match.group(0)))
-            if span is None:
-                start = 0
-                end = 0
-            else:
-                start, end = span
-            if key not in label_index:
-                issue = Issue(
-                    id=generator.next_id(),
-                    phase="cross",
-                    type="ref_error",
-                    severity="moderate",
-                    span=Span(file=path, start=start, end=end, line=line),
-                    excerpt=match.group(0),
-                    suggestion="Add the missing label or update the reference.",
-                    explanation=f"Reference '{key}' is not defined.",
-                    autofix="manual",
+            if key not in context.label_index:
+                issues.append(
+                    context.issue(
+                        match.start(),
+                        len(match.group(0)),
+                        "ref_error",
+                        "moderate",
+                        match.group(0),
+                        "Add the missing label or update the reference.",
+                        f"Reference '{key}' is not defined.",
+                    )
                 )
-                validate_issue(issue)
-                issues.append(issue)
                 continue
-            label_type = label_index[key]["type"]
+            label_type = context.label_index[key]["type"]
             if command == "eqref" and label_type != "equation":
-                issue = Issue(
-                    id=generator.next_id(),
-                    phase="cross",
-                    type="ref_error",
-                    severity="moderate",
-                    span=Span(file=path, start=start, end=end, line=line),
-                    excerpt=match.group(0),
-                    suggestion="Use the correct reference command for this label.",
-                    explanation="Equation reference used for non-equation label.",
-                    autofix="manual",
+                issues.append(
+                    context.issue(
+                        match.start(),
+                        len(match.group(0)),
+                        "ref_error",
+                        "moderate",
+                        match.group(0),
+                        "Use the correct reference command for this label.",
+                        "Equation reference used for non-equation label.",
+                    )
                 )
-                validate_issue(issue)
-                issues.append(issue)
-        for match in CITE_PATTERN.finditer(text):
-            keys = [item.strip() for item in match.group(1).split(",")]
-            line, column = location_from_index(text, match.start())
-            span = offset_index.global_range(path, line, column, len(match.group(0)))
-            if span is None:
-                start = 0
-                end = 0
-            else:
-                start, end = span
-            for key in keys:
-                if key:
-                    used_citations.add(key)
-                    if bib_keys and key not in bib_keys:
-                        issue = Issue(
-                            id=generator.next_id(),
-                            phase="cross",
-                            type="citation_missing",
-                            severity="moderate",
-                            span=Span(file=path, start=start, end=end, line=line),
-                            excerpt=match.group(0),
-                            suggestion=f"Add '{key}' to the bibliography.",
-                            explanation="Citation key missing from bibliography.",
-                            autofix="manual",
+        return issues
+
+    return finish
+
+
+def setup_cite_check(context, scanner):
+    issues = []
+
+    def on_cite(match):
+        keys = [item.strip() for item in match.group(1).split(",")]
+        for key in keys:
+            if key:
+                context.used_citations.add(key)
+                if context.bib_keys and key not in context.bib_keys:
+                    issues.append(
+                        context.issue(
+                            match.start(),
+                            len(match.group(0)),
+                            "citation_missing",
+                            "moderate",
+                            match.group(0),
+                            f"Add '{key}' to the bibliography.",
+                            "Citation key missing from bibliography.",
                         )
-                        validate_issue(issue)
-                        issues.append(issue)
-        issues.extend(check_acronyms(record, offset_index, generator))
-        issues.extend(check_styles(record, offset_index, generator))
-        issues.extend(check_units(record, offset_index, generator))
-    for key in sorted(bib_keys - used_citations):
-        issue = Issue(
-            id=generator.next_id(),
-            phase="cross",
-            type="citation_missing",
-            severity="minor",
-            span=Span(file=str(bib_path), start=0, end=0, line=1),
-            excerpt=key,
-            suggestion="Remove unused entry or cite it.",
-            explanation="Bibliography entry is unused.",
-            autofix="manual",
-        )
-        validate_issue(issue)
-        issues.append(issue)
-    return issues, label_index
+                    )
 
+    scanner.register(CITE_PATTERN, on_cite, first=r"\\")
+    return lambda: issues
 
-def check_acronyms(record, offset_index, generator):
-    path = record["path"]
-    text = record["text"]
+
+def setup_acronym_check(context, scanner):
+    text = context.text
     issues = []
     definitions = {}
     positions = {}
-    for match in re.finditer(r"([A-Za-z][^()]{2,}?)\s*\(([A-Z]{2,})\)", text):
-        expansion = match.group(1).strip()
-        acronym = match.group(2)
-        line, column = location_from_index(text, match.start(2))
-        span = offset_index.global_range(path, line, column, len(acronym))
-        if span is None:
-            start = 0
-            end = 0
-        else:
-            start, end = span
+    uses = []
+    state = {"resume": 0}
+
+    # Reproduces ACRONYM_DEFINITION_PATTERN.finditer from its "(ABC)" anchor:
+    # the expansion starts at the first letter after the previous paren (and
+    # after the previous definition) that leaves at least two characters
+    # before the whitespace preceding "(".
+    def on_paren(match):
+        paren = match.start()
+        barrier = max(text.rfind("(", 0, paren), text.rfind(")", 0, paren)) + 1
+        letter = LETTER_PATTERN.search(text, max(barrier, state["resume"]), max(paren - 2, 0))
+        if letter is None:
+            return
+        start = letter.start()
+        trimmed = len(text[start:paren].rstrip())
+        expansion = text[start:start + max(trimmed, 3)].strip()
+        acronym = match.group(1)
+        state["resume"] = match.end()
         if acronym in definitions and definitions[acronym].lower() != expansion.lower():
-            issue = Issue(
-                id=generator.next_id(),
-                phase="cross",
-                type="acronym_inconsistent",
-                severity="moderate",
-                span=Span(file=path, start=start, end=end, line=line),
-                excerpt=match.group(0),
-                suggestion="Use a single expansion for the acronym.",
-                explanation="Acronym defined with different expansions.",
-                autofix="manual",
+            issues.append(
+                context.issue(
+                    match.start(1),
+                    len(acronym),
+                    "acronym_inconsistent",
+                    "moderate",
+                    text[start:match.end()],
+                    "Use a single expansion for the acronym.",
+                    "Acronym defined with different expansions.",
+                )
             )
-            validate_issue(issue)
-            issues.append(issue)
         else:
             definitions[acronym] = expansion
-            positions[acronym] = match.start()
-    for match in re.finditer(r"\b([A-Z]{2,})\b", text):
+            positions[acronym] = start
+
+    def on_acronym(match):
         acronym = match.group(1)
-        if acronym in {"FIG", "SEC", "EQ"}:
-            continue
-        use_position = match.start()
-        if acronym not in definitions or positions.get(acronym, use_position + 1) > use_position:
-            line, column = location_from_index(text, use_position)
-            span = offset_index.global_range(path, line, column, len(acronym))
-            if span is None:
-                start = 0
-                end = 0
-            else:
-                start, end = span
-            issue = Issue(
-                id=generator.next_id(),
-                phase="cross",
-                type="acronym_inconsistent",
-                severity="minor",
-                span=Span(file=path, start=start, end=end, line=line),
-                excerpt=acronym,
-                suggestion=f"Define {acronym} at first use.",
-                explanation="Acronym used before definition.",
-                autofix="manual",
-            )
-            validate_issue(issue)
-            issues.append(issue)
-    return issues
+        if acronym not in {"FIG", "SEC", "EQ"}:
+            uses.append((acronym, match.start()))
 
+    scanner.register(ACRONYM_PAREN_PATTERN, on_paren, first="(")
+    scanner.register(ACRONYM_PATTERN, on_acronym, first="A-Z")
 
-def check_styles(record, offset_index, generator):
-    path = record["path"]
-    text = record["text"]
-    issues = []
-    for label_type, (short, long_form) in STYLE_LABELS.items():
-        occurrences = []
-        for match in re.finditer(r"\b(%s|%s)" % (re.escape(short), long_form), text):
-            occurrences.append((match.group(0), match.start()))
-        if not occurrences:
-            continue
-        count_short = sum(1 for token, _ in occurrences if token.startswith(short))
-        count_long = len(occurrences) - count_short
-        preferred = short if count_short >= count_long else long_form
-        for token, position in occurrences:
-            if token.startswith(preferred):
+    def finish():
+        for acronym, use_position in uses:
+            if acronym not in definitions or positions.get(acronym, use_position + 1) > use_position:
+                issues.append(
+                    context.issue(
+                        use_position,
+                        len(acronym),
+                        "acronym_inconsistent",
+                        "minor",
+                        acronym,
+                        f"Define {acronym} at first use.",
+                        "Acronym used before definition.",
+                    )
+                )
+        return issues
+
+    return finish
+
+
+def setup_style_check(context, scanner):
+    occurrences = {label_type: [] for label_type in STYLE_LABELS}
+    spacing = {label_type: [] for label_type in STYLE_LABELS}
+    ranges = []
+    for label_type, (label_pattern, spacing_pattern) in STYLE_PATTERNS.items():
+        scanner.register(label_pattern, occurrences[label_type].append, first="A-Z")
+        scanner.register(spacing_pattern, spacing[label_type].append, first="A-Z")
+    scanner.register(RANGE_PATTERN, ranges.append, first=r"\d")
+
+    def finish():
+        issues = []
+        for label_type, (short, long_form) in STYLE_LABELS.items():
+            found = occurrences[label_type]
+            if not found:
                 continue
-            line, column = location_from_index(text, position)
-            span = offset_index.global_range(path, line, column, len(token))
-            if span is None:
-                start = 0
-                end = 0
-            else:
-                start, end = span
-            issue = Issue(
-                id=generator.next_id(),
-                phase="cross",
-                type="style_inconsistency",
-                severity="minor",
-                span=Span(file=path, start=start, end=end, line=line),
-                excerpt=token,
-                suggestion=f"Use '{preferred}' consistently.",
-                explanation="Inconsistent label style.",
-                autofix="manual",
+            count_short = sum(1 for match in found if match.group(0).startswith(short))
+            count_long = len(found) - count_short
+            preferred = short if count_short >= count_long else long_form
+            for match in found:
+                token = match.group(0)
+                if token.startswith(preferred):
+                    continue
+                issues.append(
+                    context.issue(
+                        match.start(),
+                        len(token),
+                        "style_inconsistency",
+                        "minor",
+                        token,
+                        f"Use '{preferred}' consistently.",
+                        "Inconsistent label style.",
+                    )
+                )
+            for match in spacing[label_type]:
+                issues.append(
+                    context.issue(
+                        match.start(),
+                        len(match.group(0)),
+                        "style_inconsistency",
+                        "minor",
+                        match.group(0),
+                        "Insert '~' after the label.",
+                        "Use non-breaking space after abbreviated label.",
+                    )
+                )
+        for match in ranges:
+            issues.append(
+                context.issue(
+                    match.start(),
+                    len(match.group(0)),
+                    "style_inconsistency",
+                    "minor",
+                    match.group(0),
+                    "Use an en-dash for ranges (e.g., 1--3).",
+                    "Hyphen used for numeric range.",
+                )
             )
-            validate_issue(issue)
-            issues.append(issue)
-        pattern = re.compile(re.escape(short) + r"\s+[0-9]")
-        for match in pattern.finditer(text):
-            line, column = location_from_index(text, match.start())
-            span = offset_index.global_range(path, line, column, len(match.group(0)))
-            if span is None:
-                start = 0
-                end = 0
-            else:
-                start, end = span
-            issue = Issue(
-                id=generator.next_id(),
-                phase="cross",
-                type="style_inconsistency",
-                severity="minor",
-                span=Span(file=path, start=start, end=end, line=line),
-                excerpt=match.group(0),
-                suggestion="Insert '~' after the label.",
-                explanation="Use non-breaking space after abbreviated label.",
-                autofix="manual",
+        return issues
+
+    return finish
+
+
+def setup_unit_check(context, scanner):
+    issues = []
+
+    def on_unit(match):
+        issues.append(
+            context.issue(
+                match.start(),
+                len(match.group(0)),
+                "unit_spacing",
+                "minor",
+                match.group(0),
+                "Use '\\,' between value and unit.",
+                "Insert thin space before units.",
             )
-            validate_issue(issue)
-            issues.append(issue)
-    range_pattern = re.compile(r"\b\d+-\d+\b")
-    for match in range_pattern.finditer(text):
-        line, column = location_from_index(text, match.start())
-        span = offset_index.global_range(path, line, column, len(match.group(0)))
-        if span is None:
-            start = 0
-            end = 0
-        else:
-            start, end = span
-        issue = Issue(
-            id=generator.next_id(),
-            phase="cross",
-            type="style_inconsistency",
-            severity="minor",
-            span=Span(file=path, start=start, end=end, line=line),
-            excerpt=match.group(0),
-            suggestion="Use an en-dash for ranges (e.g., 1--3).",
-            explanation="Hyphen used for numeric range.",
-            autofix="manual",
         )
-        validate_issue(issue)
-        issues.append(issue)
+
+    scanner.register(UNIT_PATTERN, on_unit, first=r"\d")
+    return lambda: issues
+
+
+CROSS_CHECKS = [
+    setup_label_check,
+    setup_ref_check,
+    setup_cite_check,
+    setup_acronym_check,
+    setup_style_check,
+    setup_unit_check,
+]
+
+
+def register_cross_check(setup):
+    CROSS_CHECKS.append(setup)
+    return setup
+
+
+def scan_record(context, checks):
+    scanner = MultiPatternScanner()
+    finishers = [setup(context, scanner) for setup in checks]
+    scanner.scan(context.text)
+    return finishers
+
+
+def run_checks(context, checks):
+    issues = []
+    for finish in scan_record(context, checks):
+        issues.extend(finish())
     return issues
 
 
-def check_units(record, offset_index, generator):
-    path = record["path"]
-    text = record["text"]
+_WORKER_STATE = {}
+
+
+def _init_cross_worker(files, offset_index, label_index, bib_keys, checks):
+    _WORKER_STATE.update(
+        files=files, offset_index=offset_index, label_index=label_index, bib_keys=bib_keys, checks=checks
+    )
+
+
+def _check_record_worker(position):
+    context = CrossContext(
+        _WORKER_STATE["files"][position],
+        _WORKER_STATE["offset_index"],
+        label_index=_WORKER_STATE["label_index"],
+        bib_keys=_WORKER_STATE["bib_keys"],
+    )
+    return run_checks(context, _WORKER_STATE["checks"]), context.used_citations
+
+
+def _pool_context():
+    # The pool starts while LLM and profiler threads are running, so never fork this process directly.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def check_records_parallel(files, offset_index, bib_keys, workers, sink=None):
+    label_index = build_label_index(files)
     issues = []
-    unit_pattern = re.compile(r"(\d)\s+(cm|mm|km|m|s|ms|kg|g|hz|%)", re.IGNORECASE)
-    for match in unit_pattern.finditer(text):
-        line, column = location_from_index(text, match.start())
-        span = offset_index.global_range(path, line, column, len(match.group(0)))
-        if span is None:
-            start = 0
-            end = 0
-        else:
-            start, end = span
+    output = issues if sink is None else sink
+    used_citations = set()
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(files)),
+        mp_context=_pool_context(),
+        initializer=_init_cross_worker,
+        initargs=(files, offset_index, label_index, bib_keys, list(CROSS_CHECKS)),
+    ) as pool:
+        for record_issues, record_citations in pool.map(_check_record_worker, range(len(files))):
+            output.extend(record_issues)
+            used_citations.update(record_citations)
+    return issues, label_index, used_citations
+
+
+def check_records_serial(files, offset_index, bib_keys, telemetry=None, sink=None):
+    issues = []
+    output = issues if sink is None else sink
+    used_citations = set()
+    line_tables = [LineTable(record["text"]) for record in files]
+    label_index = build_label_index(files, line_tables)
+    checks = [setup for setup in CROSS_CHECKS if setup is not setup_label_check]
+    for record, lines in zip(files, line_tables):
+        context = CrossContext(
+            record, offset_index, lines, label_index=label_index, bib_keys=bib_keys, used_citations=used_citations
+        )
+        with stage(telemetry, "scan", "cross", file=record["path"]):
+            finishers = scan_record(context, checks)
+        with stage(telemetry, "finish", "cross", file=record["path"]):
+            for finish in finishers:
+                output.extend(finish())
+    return issues, label_index, used_citations
+
+
+def run_cross_pass(
+    files,
+    offset_index,
+    bib_path=None,
+    workers=1,
+    parallel_min_files=PARALLEL_MIN_FILES,
+    telemetry=None,
+    sink=None,
+):
+    bib_keys = parse_bib_keys(bib_path)
+    if workers > 1 and len(files) >= max(parallel_min_files, 2):
+        with stage(telemetry, "parallel", "cross", workers=workers):
+            issues, label_index, used_citations = check_records_parallel(
+                files, offset_index, bib_keys, workers, sink
+            )
+    else:
+        issues, label_index, used_citations = check_records_serial(files, offset_index, bib_keys, telemetry, sink)
+    for key in sorted(bib_keys - used_citations):
         issue = Issue(
-            id=generator.next_id(),
+            id="",
             phase="cross",
-            type="unit_spacing",
+            type="citation_missing",
             severity="minor",
-            span=Span(file=path, start=start, end=end, line=line),
-            excerpt=match.group(0),
-            suggestion="Use '\\,' between value and unit.",
-            explanation="Insert thin space before units.",
+            span=Span(file=str(bib_path), start=0, end=0, line=1),
+            excerpt=key,
+            suggestion="Remove unused entry or cite it.",
+            explanation="Bibliography entry is unused.",
             autofix="manual",
         )
         validate_issue(issue)
-        issues.append(issue)
-    return issues
+        if sink is None:
+            issues.append(issue)
+        else:
+            sink.push(issue)
+    assign_stable_ids(issues)
+    return issues, label_index
+
+
+def check_acronyms(record, offset_index, lines=None):
+    context = CrossContext(record, offset_index, lines)
+    return assign_stable_ids(run_checks(context, [setup_acronym_check]))
+
+
+def check_styles(record, offset_index, lines=None):
+    context = CrossContext(record, offset_index, lines)
+    return assign_stable_ids(run_checks(context, [setup_style_check]))
+
+
+def check_units(record, offset_index, lines=None):
+    context = CrossContext(record, offset_index, lines)
+    return assign_stable_ids(run_checks(context, [setup_unit_check]))
@@ -0,0 +1,130 @@
+import json
+from bisect import bisect_right
+
+from pfread.passes.paragraphs import (
+    PARAGRAPH_MAX_TOKENS,
+    PARAGRAPH_SCHEMA,
+    PARAGRAPH_STYLE,
+    build_paragraph_issues,
+    diagnose_paragraphs,
+    pack_paragraphs,
+    paragraph_request,
+    split_paragraphs,
+)
+from pfread.passes.sentences import (
+    SENTENCE_MAX_TOKENS,
+    SENTENCE_SCHEMA,
+    build_sentence_issues,
+    demux_batch_response,
+    proofread_individually,
+    sentence_request,
+    split_sentences,
+    triage_sentences,
+)
+from pfread.utils.diffutil import sentence_diff
+from pfread.utils.schema import assign_stable_ids
+from pfread.utils.telemetry import estimate_tokens
+
+SYSTEM_PROMPT = (
+    "You are a precise proofreader and clarity reviewer. For each listed sentence, fix grammar, spelling, "
+    "punctuation, agreement and capitalization with minimal edits. For the paragraph, report clarity diagnostics "
+    "only, keep suggestions under fifteen words. Return STRICT JSON."
+)
+FUSED_TEMPERATURE = 0.0
+
+
+def group_sentences(paragraphs, sentences, indices):
+    starts = [paragraph["start"] for paragraph in paragraphs]
+    groups = [[] for _ in paragraphs]
+    for index in indices:
+        slot = bisect_right(starts, sentences[index]["start"]) - 1
+        groups[max(slot, 0)].append(index)
+    return groups
+
+
+def fused_request(paragraph, sentences, group):
+    payload = {
+        "task": "proofread_paragraph",
+        "style": PARAGRAPH_STYLE,
+        "paragraph": paragraph["text"],
+        "sentences": [{"id": "s%d" % slot, "text": sentences[index]["text"]} for slot, index in enumerate(group)],
+        "schema": {
+            "sentences": [dict(SENTENCE_SCHEMA["edit"], id="s0")],
+            "diagnostics": PARAGRAPH_SCHEMA,
+        },
+    }
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def demux_fused_response(response, group):
+    if not isinstance(response, dict) or not isinstance(response.get("diagnostics"), list):
+        return None
+    results = demux_batch_response({"results": response.get("sentences")}, range(len(group)))
+    if results is None:
+        return None
+    return {"sentences": results, "diagnostics": response["diagnostics"]}
+
+
+def separate_requests(paragraphs, sentences, groups):
+    requests = [sentence_request(sentences[index]["text"]) for group in groups for index in group]
+    requests.extend(paragraph_request(paragraph["text"]) for paragraph in paragraphs)
+    return requests
+
+
+def proofread_fused(paragraphs, sentences, groups, llm_client):
+    requests = [fused_request(paragraph, sentences, group) for paragraph, group in zip(paragraphs, groups)]
+    raw = llm_client.complete_json_many(
+        SYSTEM_PROMPT,
+        requests,
+        temperature=FUSED_TEMPERATURE,
+        max_tokens=PARAGRAPH_MAX_TOKENS + SENTENCE_MAX_TOKENS * max((len(group) for group in groups), default=0),
+    )
+    results = [demux_fused_response(response, group) for response, group in zip(raw, groups)]
+    fallback = [slot for slot, result in enumerate(results) if result is None]
+    if fallback:
+        retried_sentences = proofread_individually(
+            [sentences[index]["text"] for slot in fallback for index in groups[slot]], llm_client
+        )
+        retried_diagnostics = diagnose_paragraphs([paragraphs[slot]["text"] for slot in fallback], llm_client)
+        position = 0
+        for slot, diagnostics in zip(fallback, retried_diagnostics):
+            count = len(groups[slot])
+            results[slot] = {"sentences": retried_sentences[position:position + count], "diagnostics": diagnostics}
+            position += count
+    baseline = separate_requests(paragraphs, sentences, groups)
+    sent = requests + separate_requests(
+        [paragraphs[slot] for slot in fallback], sentences, [groups[slot] for slot in fallback]
+    )
+    llm_client.telemetry.increment("fused_calls_saved", len(baseline) - len(sent))
+    llm_client.telemetry.increment(
+        "fused_tokens_saved",
+        sum(estimate_tokens(request) for request in baseline) - sum(estimate_tokens(request) for request in sent),
+    )
+    return results
+
+
+def run_fused_pass(text, offset_index, llm_client, state=None, triage="off", typo_sink=None, paragraph_sink=None):
+    with llm_client.telemetry.span("split_sentences"):
+        sentences = split_sentences(text)
+    with llm_client.telemetry.span("split_paragraphs"):
+        paragraphs = [paragraph for paragraph in split_paragraphs(text) if paragraph["text"].strip()]
+    groups = group_sentences(paragraphs, sentences, triage_sentences(sentences, llm_client, triage))
+    if state is None:
+        results = proofread_fused(paragraphs, sentences, groups, llm_client)
+    else:
+        results = state.resolve(
+            "fused",
+            [fused_request(paragraph, sentences, group) for paragraph, group in zip(paragraphs, groups)],
+            lambda pending: proofread_fused(
+                [paragraphs[slot] for slot in pending], sentences, [groups[slot] for slot in pending], llm_client
+            ),
+        )
+    sentence_responses = [{"status": "ok"}] * len(sentences)
+    for group, result in zip(groups, results):
+        for index, response in zip(group, result["sentences"]):
+            sentence_responses[index] = response
+    typo_issues, edits = build_sentence_issues(sentences, sentence_responses, offset_index, typo_sink)
+    paragraph_issues = build_paragraph_issues(
+        pack_paragraphs(paragraphs), [result["diagnostics"] for result in results], offset_index, paragraph_sink
+    )
+    return assign_stable_ids(typo_issues), assign_stable_ids(paragraph_issues), edits, sentence_diff(edits)
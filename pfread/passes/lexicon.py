@@ -0,0 +1,75 @@
+import hashlib
+import math
+import struct
+from functools import lru_cache
+from pathlib import Path
+
+LEXICON_PATH = Path(__file__).with_name("lexicon.bloom")
+HEADER = struct.Struct("<4sIII")
+MAGIC = b"PFBL"
+LEXICON_VERSION = 1
+ERROR_RATE = 0.001
+EXTRA_WORDS = (
+    "ablations", "autoregressive", "backbones", "backend", "backends", "backpropagation", "batchnorm", "benchmarked",
+    "benchmarking", "checkpoints", "convolutional", "dataloader", "dataset", "datasets", "decoders",
+    "downsampling", "dropout", "embeddings", "encoders", "eval", "evals", "finetune", "finetuned", "finetunes",
+    "finetuning", "gelu", "hyperparameter", "hyperparameters", "latency", "layernorm", "learnable",
+    "logit", "logits", "lookup", "lookups", "metadata", "minibatch", "minibatches", "multi", "multilingual",
+    "multimodal", "online", "optimizers", "overfitting", "parallelization", "parameterization", "perplexity",
+    "pipelines", "preprocessing", "pretrain", "pretrained", "pretraining", "quantization", "quantized",
+    "regularization", "regularizer", "regularizers", "relu", "runtime", "runtimes", "scalability", "softmax",
+    "softmaxes", "subsampling", "tokenization", "tokenizations", "tokenize", "tokenized", "tokenizer", "tokenizers",
+    "tokenizing", "transformers", "underfitting", "unsupervised", "upsampling", "whitespace", "workflow", "workflows",
+)
+
+
+def _positions(word, size, hashes):
+    digest = hashlib.blake2b(word.encode("utf-8"), digest_size=16).digest()
+    first, second = struct.unpack("<QQ", digest)
+    second |= 1
+    return [(first + index * second) % size for index in range(hashes)]
+
+
+class BloomFilter:
+    def __init__(self, size, hashes, bits=None):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, count, error_rate=ERROR_RATE):
+        size = max(8, int(math.ceil(-count * math.log(error_rate) / math.log(2) ** 2)))
+        hashes = max(1, int(round(size / max(count, 1) * math.log(2))))
+        return cls(size, hashes)
+
+    def add(self, word):
+        for position in _positions(word, self.size, self.hashes):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, word):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in _positions(word, self.size, self.hashes))
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, LEXICON_VERSION, self.size, self.hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, size, hashes = HEADER.unpack_from(data)
+        if magic != MAGIC or version != LEXICON_VERSION:
+            raise ValueError("Unsupported lexicon file")
+        return cls(size, hashes, bytes(data[HEADER.size:]))
+
+
+def build_lexicon(words, path=LEXICON_PATH, error_rate=ERROR_RATE):
+    words = sorted({word.strip().lower() for word in words if word.strip()} | set(EXTRA_WORDS))
+    bloom = BloomFilter.for_capacity(len(words), error_rate)
+    for word in words:
+        bloom.add(word)
+    Path(path).write_bytes(bloom.to_bytes())
+    return bloom
+
+
+@lru_cache(maxsize=None)
+def load_lexicon(path=LEXICON_PATH):
+    return BloomFilter.from_bytes(Path(path).read_bytes())
@@ -1,10 +1,25 @@
 import json
+from bisect import bisect_right
 
-from pfread.utils.schema import Issue, IssueIdGenerator, Span, validate_issue
+from pfread.passes.sentences import split_sentences
+from pfread.utils.schema import Issue, Span, assign_stable_ids, validate_issue
+from pfread.utils.telemetry import estimate_tokens
 
 SYSTEM_PROMPT = (
     "You assess LaTeX paragraphs for clarity. Report diagnostics only, keep suggestions under fifteen words."
 )
+PARAGRAPH_STYLE = {"tone": "neutral", "limit": "diagnostics_only"}
+PARAGRAPH_SCHEMA = [
+    {
+        "type": "topic_drift",
+        "severity": "minor",
+        "span": {"start": 0, "end": 0},
+        "suggestion": "...",
+        "explanation": "...",
+    }
+]
+PARAGRAPH_MAX_TOKENS = 320
+PACK_SEPARATOR = "\n\n"
 
 
 def split_paragraphs(text):
@@ -25,32 +40,152 @@ def split_paragraphs(text):
     return paragraphs
 
 
-def run_paragraph_pass(text, offset_index, llm_client, issue_id=None):
-    generator = issue_id or IssueIdGenerator()
-    issues = []
-    for paragraph in split_paragraphs(text):
-        if not paragraph["text"].strip():
-            continue
-        payload = {
-            "task": "paragraph_diagnose",
-            "style": {"tone": "neutral", "limit": "diagnostics_only"},
-            "paragraph": paragraph["text"],
-            "schema": [
-                {
-                    "type": "topic_drift",
-                    "severity": "minor",
-                    "span": {"start": 0, "end": 0},
-                    "suggestion": "...",
-                    "explanation": "...",
-                }
-            ],
+def paragraph_request(paragraph_text):
+    payload = {
+        "task": "paragraph_diagnose",
+        "style": PARAGRAPH_STYLE,
+        "paragraph": paragraph_text,
+        "schema": PARAGRAPH_SCHEMA,
+    }
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def diagnose_paragraphs(paragraph_texts, llm_client):
+    return llm_client.complete_json_many(
+        SYSTEM_PROMPT,
+        [paragraph_request(paragraph_text) for paragraph_text in paragraph_texts],
+        temperature=0.2,
+        max_tokens=PARAGRAPH_MAX_TOKENS,
+    )
+
+
+def shift_entries(entries, offset):
+    shifted = []
+    for entry in entries:
+        span_data = entry.get("span", {})
+        start = int(span_data.get("start", 0))
+        end = int(span_data.get("end", start))
+        shifted.append(dict(entry, span={"start": start + offset, "end": end + offset}))
+    return shifted
+
+
+def diagnose_chunks(chunks, llm_client):
+    texts = [chunk["text"] for chunk in chunks]
+    largest = max((len(chunk["pieces"]) for chunk in chunks), default=1)
+    if largest == 1:
+        return diagnose_paragraphs(texts, llm_client)
+    responses = llm_client.complete_json_many(
+        SYSTEM_PROMPT,
+        [paragraph_request(text) for text in texts],
+        temperature=0.2,
+        max_tokens=PARAGRAPH_MAX_TOKENS * largest,
+        return_exceptions=True,
+    )
+    fallback = [index for index, response in enumerate(responses) if not isinstance(response, list)]
+    if fallback:
+        pieces = [(index, slot) for index in fallback for slot in range(len(chunks[index]["pieces"]))]
+        retried = diagnose_paragraphs([chunks[index]["pieces"][slot]["text"] for index, slot in pieces], llm_client)
+        for index in fallback:
+            responses[index] = []
+        for (index, slot), response in zip(pieces, retried):
+            if isinstance(response, list):
+                responses[index].extend(shift_entries(response, chunks[index]["offsets"][slot]))
+    return responses
+
+
+def split_oversized(paragraph, token_budget):
+    pieces = []
+    current = None
+    used = 0
+    for sentence in split_sentences(paragraph["text"]):
+        cost = estimate_tokens(sentence["text"])
+        if current is not None and used + cost > token_budget:
+            pieces.append(current)
+            current = None
+            used = 0
+        if current is None:
+            current = [sentence["start"], sentence["end"]]
+        current[1] = sentence["end"]
+        used += cost
+    if current is not None:
+        pieces.append(current)
+    return [
+        {
+            "text": paragraph["text"][start:end],
+            "start": paragraph["start"] + start,
+            "end": paragraph["start"] + end,
         }
-        response = llm_client.complete_json(
-            SYSTEM_PROMPT,
-            json.dumps(payload, ensure_ascii=False),
-            temperature=0.2,
-            max_tokens=320,
+        for start, end in pieces
+    ] or [paragraph]
+
+
+def make_chunk(pieces):
+    offsets = []
+    position = 0
+    for piece in pieces:
+        offsets.append(position)
+        position += len(piece["text"]) + len(PACK_SEPARATOR)
+    return {
+        "text": PACK_SEPARATOR.join(piece["text"] for piece in pieces),
+        "pieces": pieces,
+        "offsets": offsets,
+    }
+
+
+def pack_paragraphs(paragraphs, token_budget=0):
+    if not token_budget:
+        return [make_chunk([paragraph]) for paragraph in paragraphs]
+    pieces = []
+    for paragraph in paragraphs:
+        if estimate_tokens(paragraph["text"]) > token_budget:
+            pieces.extend(split_oversized(paragraph, token_budget))
+        else:
+            pieces.append(paragraph)
+    chunks = []
+    current = []
+    used = 0
+    for piece in pieces:
+        cost = estimate_tokens(piece["text"])
+        if current and used + cost > token_budget:
+            chunks.append(make_chunk(current))
+            current = []
+            used = 0
+        current.append(piece)
+        used += cost
+    if current:
+        chunks.append(make_chunk(current))
+    return chunks
+
+
+def locate_span(chunk, local_start, local_end):
+    slot = max(bisect_right(chunk["offsets"], local_start) - 1, 0)
+    piece = chunk["pieces"][slot]
+    base = chunk["offsets"][slot]
+    start = local_start - base
+    end = local_end - base
+    if slot < len(chunk["pieces"]) - 1:
+        end = min(end, len(piece["text"]))
+    return piece, start, max(end, start)
+
+
+def run_paragraph_pass(text, offset_index, llm_client, state=None, token_budget=0, sink=None):
+    with llm_client.telemetry.span("split_paragraphs"):
+        paragraphs = [paragraph for paragraph in split_paragraphs(text) if paragraph["text"].strip()]
+        chunks = pack_paragraphs(paragraphs, token_budget)
+    if state is None:
+        responses = diagnose_chunks(chunks, llm_client)
+    else:
+        responses = state.resolve(
+            "paragraph",
+            [chunk["text"] for chunk in chunks],
+            lambda pending: diagnose_chunks([chunks[index] for index in pending], llm_client),
         )
+    return assign_stable_ids(build_paragraph_issues(chunks, responses, offset_index, sink))
+
+
+def build_paragraph_issues(chunks, responses, offset_index, sink=None):
+    issues = []
+    for chunk, response in zip(chunks, responses):
         if not isinstance(response, list):
             continue
         for entry in response:
@@ -59,6 +194,7 @@ def run_paragraph_pass(text, offset_index, llm_client, issue_id=None):
             local_end = int(span_data.get("end", local_start))
             if local_end < local_start:
                 continue
+            paragraph, local_start, local_end = locate_span(chunk, local_start, local_end)
             start = paragraph["start"] + local_start
             end = paragraph["start"] + local_end
             if len(offset_index) > 0:
@@ -72,7 +208,7 @@ def run_paragraph_pass(text, offset_index, llm_client, issue_id=None):
                 file_path = offset_index.entries[0].file
             line = offset_index.line_at(mapped_start)
             issue = Issue(
-                id=generator.next_id(),
+                id="",
                 phase="paragraph",
                 type=entry.get("type", "other"),
                 severity=entry.get("severity", "minor"),
@@ -83,5 +219,8 @@ def run_paragraph_pass(text, offset_index, llm_client, issue_id=None):
                 autofix="manual",
             )
             validate_issue(issue)
-            issues.append(issue)
+            if sink is None:
+                issues.append(issue)
+            else:
+                sink.push(issue)
     return issues
@@ -1,12 +1,43 @@
 import json
+import re
+from functools import lru_cache
 
+from pfread.passes.triage import needs_llm
 from pfread.utils.diffutil import sentence_diff
-from pfread.utils.schema import Issue, IssueIdGenerator, Span, validate_issue
+from pfread.utils.schema import Issue, Span, assign_stable_ids, validate_issue
+from pfread.utils.telemetry import estimate_tokens
 
 SYSTEM_PROMPT = (
     "You are a precise proofreader. Preserve meaning. Prefer minimal edits. Fix grammar, spelling, punctuation, "
     "agreement, capitalization. No rewrites unless necessary for correctness. Return STRICT JSON."
 )
+SENTENCE_SCHEMA = {
+    "ok": {"status": "ok"},
+    "edit": {
+        "status": "edit",
+        "original": "...",
+        "suggestion": "...",
+        "types": ["spelling"],
+        "explanation": "...",
+    },
+}
+SENTENCE_MAX_TOKENS = 64
+ABBREVIATIONS = (
+    "e.g.", "i.e.", "cf.", "vs.", "viz.", "resp.", "approx.", "et al.",
+    "Fig.", "Figs.", "Eq.", "Eqs.", "Sec.", "Secs.", "Tab.", "Ref.", "Refs.", "Ch.", "App.", "Thm.", "Def.",
+    "No.", "Dr.", "Prof.", "Mr.", "Mrs.", "Ms.",
+)
+ABBREVIATION_LOOKBACK = 16
+SPLIT_SPECIAL_PATTERN = re.compile(r"\\[()\[\]]|[${}\[\].!?]")
+SENTENCE_CLOSERS_PATTERN = re.compile(r"[\"')\]]*")
+
+
+@lru_cache(maxsize=8)
+def abbreviation_regex(abbreviations):
+    if not abbreviations:
+        return None
+    alternatives = "|".join(re.escape(item) for item in sorted(abbreviations, key=len, reverse=True))
+    return re.compile(r"(?<![A-Za-z.])(?:%s)$" % alternatives)
 
 
 def trim_segment(segment):
@@ -19,68 +50,69 @@ def trim_segment(segment):
     return segment[left:right], left, right
 
 
-def split_sentences(text):
+def split_sentences(text, abbreviations=ABBREVIATIONS):
+    abbreviation_pattern = abbreviation_regex(abbreviations)
     sentences = []
     start = 0
     braces = 0
     brackets = 0
     inline_math = False
     display_math = 0
-    index = 0
     length = len(text)
-    while index < length:
-        char = text[index]
-        if text.startswith("\\(", index):
+    for match in SPLIT_SPECIAL_PATTERN.finditer(text):
+        token = match.group()
+        if token == "\\(":
             inline_math = True
-            index += 2
             continue
-        if text.startswith("\\)", index):
+        if token == "\\)":
             inline_math = False
-            index += 2
             continue
-        if text.startswith("\\[", index):
+        if token == "\\[":
             display_math += 1
-            index += 2
             continue
-        if text.startswith("\\]", index):
+        if token == "\\]":
             if display_math > 0:
                 display_math -= 1
-            index += 2
             continue
-        if char == "$":
+        if token == "$":
             inline_math = not inline_math
-            index += 1
             continue
-        if char == "{":
+        if token == "{":
             braces += 1
-        elif char == "}":
+            continue
+        if token == "}":
             if braces > 0:
                 braces -= 1
-        elif char == "[":
+            continue
+        if token == "[":
             brackets += 1
-        elif char == "]":
+            continue
+        if token == "]":
             if brackets > 0:
                 brackets -= 1
-        boundary = False
-        if char in {".", "!", "?"} and not braces and not brackets and not inline_math and display_math == 0:
-            peek = index + 1
-            while peek < length and text[peek] in {'"', "'", ")", "]"}:
-                peek += 1
-            if peek >= length or text[peek].isspace():
-                boundary = True
-        if boundary:
-            segment = text[start:index + 1]
-            cleaned, offset_left, offset_right = trim_segment(segment)
-            if cleaned:
-                sentences.append(
-                    {
-                        "text": cleaned,
-                        "start": start + offset_left,
-                        "end": start + offset_right,
-                    }
-                )
-            start = index + 1
-        index += 1
+            continue
+        if braces or brackets or inline_math or display_math:
+            continue
+        index = match.start()
+        peek = SENTENCE_CLOSERS_PATTERN.match(text, index + 1).end()
+        if peek < length and not text[peek].isspace():
+            continue
+        if (
+            abbreviation_pattern is not None
+            and token == "."
+            and abbreviation_pattern.search(text, max(index - ABBREVIATION_LOOKBACK, 0), index + 1)
+        ):
+            continue
+        cleaned, offset_left, offset_right = trim_segment(text[start:index + 1])
+        if cleaned:
+            sentences.append(
+                {
+                    "text": cleaned,
+                    "start": start + offset_left,
+                    "end": start + offset_right,
+                }
+            )
+        start = index + 1
     if start < length:
         segment = text[start:length]
         cleaned, offset_left, offset_right = trim_segment(segment)
@@ -95,32 +127,121 @@ def split_sentences(text):
     return sentences
 
 
-def run_sentences_pass(text, offset_index, llm_client, issue_id=None):
-    generator = issue_id or IssueIdGenerator()
+def sentence_request(sentence_text):
+    payload = {
+        "task": "proofread_sentence",
+        "schema": SENTENCE_SCHEMA,
+        "sentence": sentence_text,
+    }
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def proofread_individually(sentence_texts, llm_client):
+    return llm_client.complete_json_many(
+        SYSTEM_PROMPT,
+        [sentence_request(sentence_text) for sentence_text in sentence_texts],
+        temperature=0.0,
+        max_tokens=SENTENCE_MAX_TOKENS,
+    )
+
+
+def pack_sentence_batches(sentences, token_budget):
+    batches = []
+    current = []
+    used = 0
+    for index, sentence in enumerate(sentences):
+        cost = estimate_tokens(sentence["text"]) + 1
+        if current and used + cost > token_budget:
+            batches.append(current)
+            current = []
+            used = 0
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def batch_request(sentences, batch):
+    payload = {
+        "task": "proofread_sentence_batch",
+        "schema": {"results": [dict(SENTENCE_SCHEMA["edit"], id="s0")]},
+        "sentences": [{"id": "s%d" % index, "text": sentences[index]["text"]} for index in batch],
+    }
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def demux_batch_response(response, batch):
+    if not isinstance(response, dict) or not isinstance(response.get("results"), list):
+        return None
+    by_id = {}
+    for result in response["results"]:
+        if not isinstance(result, dict) or result.get("status") not in {"ok", "edit"}:
+            return None
+        by_id[result.get("id")] = result
+    ordered = []
+    for index in batch:
+        result = by_id.get("s%d" % index)
+        if result is None:
+            return None
+        ordered.append(result)
+    return ordered
+
+
+def proofread_batched(sentences, llm_client, token_budget):
+    batches = pack_sentence_batches(sentences, token_budget)
+    batch_responses = llm_client.complete_json_many(
+        SYSTEM_PROMPT,
+        [batch_request(sentences, batch) for batch in batches],
+        temperature=0.0,
+        max_tokens=SENTENCE_MAX_TOKENS * max((len(batch) for batch in batches), default=1),
+        return_exceptions=True,
+    )
+    responses = [None] * len(sentences)
+    fallback = []
+    for batch, response in zip(batches, batch_responses):
+        results = None if isinstance(response, Exception) else demux_batch_response(response, batch)
+        if results is None:
+            fallback.extend(batch)
+            continue
+        for index, result in zip(batch, results):
+            responses[index] = result
+    if fallback:
+        retried = proofread_individually([sentences[index]["text"] for index in fallback], llm_client)
+        for index, result in zip(fallback, retried):
+            responses[index] = result
+    return responses
+
+
+def proofread_sentences(sentences, llm_client, batch_tokens=0):
+    if batch_tokens:
+        return proofread_batched(sentences, llm_client, batch_tokens)
+    return proofread_individually([sentence["text"] for sentence in sentences], llm_client)
+
+
+def resolve_sentences(sentences, llm_client, batch_tokens=0, state=None):
+    if state is None:
+        return proofread_sentences(sentences, llm_client, batch_tokens)
+    return state.resolve(
+        "sentence",
+        [sentence["text"] for sentence in sentences],
+        lambda pending: proofread_sentences([sentences[index] for index in pending], llm_client, batch_tokens),
+    )
+
+
+def triage_sentences(sentences, llm_client, triage="off"):
+    with llm_client.telemetry.span("triage"):
+        suspicious = [index for index, sentence in enumerate(sentences) if needs_llm(sentence["text"], triage)]
+    if triage != "off":
+        llm_client.telemetry.increment("triage_sent", len(suspicious))
+        llm_client.telemetry.increment("triage_skipped", len(sentences) - len(suspicious))
+    return suspicious
+
+
+def build_sentence_issues(sentences, responses, offset_index, sink=None):
     issues = []
     edits = []
-    sentences = split_sentences(text)
-    for sentence in sentences:
-        payload = {
-            "task": "proofread_sentence",
-            "schema": {
-                "ok": {"status": "ok"},
-                "edit": {
-                    "status": "edit",
-                    "original": "...",
-                    "suggestion": "...",
-                    "types": ["spelling"],
-                    "explanation": "...",
-                },
-            },
-            "sentence": sentence["text"],
-        }
-        response = llm_client.complete_json(
-            SYSTEM_PROMPT,
-            json.dumps(payload, ensure_ascii=False),
-            temperature=0.0,
-            max_tokens=64,
-        )
+    for sentence, response in zip(sentences, responses):
         status = response.get("status")
         if status == "ok":
             continue
@@ -142,7 +263,7 @@ def run_sentences_pass(text, offset_index, llm_client, issue_id=None):
                 file_path = offset_index.entries[0].file
             line = offset_index.line_at(mapped_start)
             issue = Issue(
-                id=generator.next_id(),
+                id="",
                 phase="typo",
                 type=issue_type,
                 severity="minor",
@@ -153,7 +274,23 @@ def run_sentences_pass(text, offset_index, llm_client, issue_id=None):
                 autofix="safe",
             )
             validate_issue(issue)
-            issues.append(issue)
+            if sink is None:
+                issues.append(issue)
+            else:
+                sink.push(issue)
             edits.append({"original": original, "suggestion": suggestion})
+    return issues, edits
+
+
+def run_sentences_pass(text, offset_index, llm_client, batch_tokens=0, state=None, triage="off", sink=None):
+    with llm_client.telemetry.span("split_sentences"):
+        sentences = split_sentences(text)
+    responses = [{"status": "ok"}] * len(sentences)
+    suspicious = triage_sentences(sentences, llm_client, triage)
+    checked = resolve_sentences([sentences[index] for index in suspicious], llm_client, batch_tokens, state)
+    for index, response in zip(suspicious, checked):
+        responses[index] = response
+    issues, edits = build_sentence_issues(sentences, responses, offset_index, sink)
+    assign_stable_ids(issues)
     diff_text = sentence_diff(edits)
     return issues, edits, diff_text
@@ -0,0 +1,83 @@
+import re
+
+from pfread.passes.lexicon import load_lexicon
+
+TRIAGE_LEVELS = {
+    "off": None,
+    "conservative": {"max_words": 12, "skip_math": False},
+    "balanced": {"max_words": 30, "skip_math": True},
+    "aggressive": {"max_words": None, "skip_math": True},
+}
+
+COMMON_MISSPELLINGS = {
+    "accomodate", "accross", "acheive", "adress", "algoritm", "alot", "aquire", "arguement", "basicly",
+    "begining", "beleive", "calender", "comparision", "concious", "definately", "dependancy", "enviroment",
+    "existance", "experiement", "familar", "finaly", "foward", "goverment", "grammer", "heigth", "higly",
+    "independant", "lenght", "millenium", "neccessary", "noticable", "occassion", "occured", "occurence",
+    "paramter", "perfomance", "persue", "posession", "preceeding", "priviledge", "publically", "recieve",
+    "recomend", "refered", "relevent", "seperate", "similiar", "succesful", "supercede", "teh", "thier",
+    "threshhold", "tommorow", "truely", "untill", "wich", "widht", "wierd", "wihch", "wiht",
+}
+
+LEXICON_MIN_LENGTH = 3
+WORD_PATTERN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+REPEATED_WORD_PATTERN = re.compile(r"\b([A-Za-z]+)\s+\1\b", re.IGNORECASE)
+ARTICLE_PATTERNS = (
+    re.compile(r"\ba\s+(?!one\b|once\b|uni|use|usu|eu|ur)[aeiou]", re.IGNORECASE),
+    re.compile(r"\ban\s+(?!h|uni|one\b)[bcdfgjklmnpqrstvwxyz][a-z]", re.IGNORECASE),
+)
+AGREEMENT_PATTERNS = (
+    re.compile(r"\b(?:he|she|it)\s+(?:are|were|have|do|don't)\b", re.IGNORECASE),
+    re.compile(r"\b(?:they|we|you|i)\s+(?:is|was|has|does|doesn't)\b", re.IGNORECASE),
+    re.compile(r"\b(?:is|are|was|were)\s+(?:is|are|was|were)\b", re.IGNORECASE),
+)
+PUNCTUATION_PATTERNS = (
+    re.compile(r"[,;:]\s*[,;:.]"),
+    re.compile(r"\s[,;:!?]"),
+    re.compile(r"[,;](?=[A-Za-z])"),
+    re.compile(r"[.!?]{2,}$"),
+)
+MATH_PATTERN = re.compile(r"\$[^$]*\$")
+
+
+def unknown_words(text):
+    lexicon = load_lexicon()
+    unknown = []
+    for position, match in enumerate(WORD_PATTERN.finditer(text)):
+        word = match.group()
+        if len(word) < LEXICON_MIN_LENGTH or not word[1:].islower() or (position and word[0].isupper()):
+            continue
+        lowered = word.lower()
+        if lowered in COMMON_MISSPELLINGS or (lowered not in lexicon and lowered.split("'")[0] not in lexicon):
+            unknown.append(word)
+    return unknown
+
+
+def triage_signals(text):
+    signals = []
+    if unknown_words(text):
+        signals.append("spelling")
+    if REPEATED_WORD_PATTERN.search(text):
+        signals.append("repeated_word")
+    if any(pattern.search(text) for pattern in ARTICLE_PATTERNS):
+        signals.append("article")
+    if any(pattern.search(text) for pattern in AGREEMENT_PATTERNS):
+        signals.append("agreement")
+    if any(pattern.search(text) for pattern in PUNCTUATION_PATTERNS):
+        signals.append("punctuation")
+    return signals
+
+
+def is_math_heavy(text):
+    covered = sum(len(match.group()) for match in MATH_PATTERN.finditer(text))
+    return covered * 2 > len(text)
+
+
+def needs_llm(text, level):
+    settings = TRIAGE_LEVELS[level]
+    if settings is None or triage_signals(text):
+        return True
+    if settings["skip_math"] and is_math_heavy(text):
+        return False
+    limit = settings["max_words"]
+    return limit is not None and len(WORD_PATTERN.findall(text)) > limit
@@ -1,3 +1,5 @@
 from .latex_flatten import flatten_sources, clean_line
+from .document_graph import resolve_document
+from .flatten_cache import FlattenCache
 
-__all__ = ["flatten_sources", "clean_line"]
+__all__ = ["flatten_sources", "clean_line", "resolve_document", "FlattenCache"]
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from pfread.preprocess.latex_flatten import COMMENT_PATTERN
+from pfread.utils import io
+
+GRAPH_CACHE_VERSION = 1
+INCLUDE_PATTERN = re.compile(r"\\(input|include|subfile)\{([^}]+)\}")
+INCLUDEONLY_PATTERN = re.compile(r"\\includeonly\{([^}]*)\}")
+
+
+def scan_includes(content):
+    includes = []
+    includeonly = None
+    for line in content.splitlines():
+        comment = COMMENT_PATTERN.search(line)
+        if comment is not None:
+            line = line[:comment.end() - 1]
+        for match in INCLUDE_PATTERN.finditer(line):
+            includes.append([match.group(1), match.group(2).strip()])
+        for match in INCLUDEONLY_PATTERN.finditer(line):
+            includeonly = [item.strip() for item in match.group(1).split(",") if item.strip()]
+    return {"includes": includes, "includeonly": includeonly}
+
+
+def candidate_paths(name, base_dirs):
+    names = [name] if name.endswith(".tex") else [name + ".tex", name]
+    return [base / candidate for base in base_dirs for candidate in names]
+
+
+def resolve_target(name, base_dirs):
+    for path in candidate_paths(name, base_dirs):
+        if path.is_file():
+            return path
+    return None
+
+
+def load_graph_cache(cache_path):
+    if cache_path is None:
+        return {}
+    try:
+        data = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if data.get("version") != GRAPH_CACHE_VERSION:
+        return {}
+    return data
+
+
+def file_sha(path):
+    return hashlib.sha1(Path(path).read_text(encoding="utf-8").encode("utf-8")).hexdigest()
+
+
+def cached_order(cache, main_path):
+    if cache.get("main") != str(main_path) or "order" not in cache:
+        return None
+    scanned = cache.get("files", {})
+    for path in cache["order"]:
+        entry = scanned.get(path)
+        if entry is None or not Path(path).is_file() or file_sha(path) != entry["sha"]:
+            return None
+    if any(Path(path).is_file() for path in cache.get("missing", [])):
+        return None
+    return [Path(path) for path in cache["order"]]
+
+
+def resolve_document(main_path, cache_path=None):
+    main_path = Path(main_path)
+    cache = load_graph_cache(cache_path)
+    order = cached_order(cache, main_path)
+    if order is not None:
+        return order
+    previous = cache.get("files", {})
+    scanned = {}
+    root = main_path.parent
+    order = []
+    missing = []
+    seen = set()
+    includeonly = None
+    stack = [main_path]
+    while stack:
+        path = stack.pop()
+        key = path.resolve()
+        if key in seen:
+            continue
+        seen.add(key)
+        order.append(path)
+        content = path.read_text(encoding="utf-8")
+        sha = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        entry = previous.get(str(path))
+        if entry is None or entry["sha"] != sha:
+            entry = dict(scan_includes(content), sha=sha)
+        scanned[str(path)] = entry
+        if path == main_path:
+            includeonly = entry["includeonly"]
+        children = []
+        for command, name in entry["includes"]:
+            if command == "include" and includeonly is not None and name.removesuffix(".tex") not in includeonly:
+                continue
+            target = resolve_target(name, [root, path.parent])
+            if target is None:
+                missing.extend(str(candidate) for candidate in candidate_paths(name, [root, path.parent]))
+                continue
+            children.append(target)
+        stack.extend(reversed(children))
+    if cache_path is not None:
+        payload = {
+            "version": GRAPH_CACHE_VERSION,
+            "main": str(main_path),
+            "order": [str(path) for path in order],
+            "files": scanned,
+            "missing": sorted(set(missing)),
+        }
+        io.write_json(cache_path, payload)
+    return order
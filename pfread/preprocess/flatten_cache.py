@@ -0,0 +1,143 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from pfread.preprocess.latex_flatten import FLATTEN_VERSION
+
+MAGIC = b"PFFC"
+HEADER = struct.Struct("<4sIIIII")
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+TYPECODES = {"lines": "I", "counts": "I", "columns": "I", "unsorted": "B"}
+
+
+def _to_bytes(values):
+    if sys.byteorder != "little" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _view_of(typecode, view):
+    if sys.byteorder == "little" or typecode == "B":
+        return view.cast(typecode)
+    values = array(typecode)
+    values.frombytes(view)
+    values.byteswap()
+    return values
+
+
+def copy_segment(segment):
+    copied = dict(segment)
+    for name, typecode in TYPECODES.items():
+        copied[name] = array(typecode)
+        copied[name].frombytes(memoryview(segment[name]).cast("B"))
+    return copied
+
+
+def encode_segment(segment):
+    text = segment["text"].encode("utf-8")
+    groups = len(segment["lines"])
+    header = HEADER.pack(
+        MAGIC, FLATTEN_VERSION, array("I").itemsize, len(text), groups, len(segment["columns"])
+    )
+    return b"".join(
+        [
+            header,
+            _to_bytes(segment["lines"]),
+            _to_bytes(segment["counts"]),
+            _to_bytes(segment["unsorted"]),
+            _to_bytes(segment["columns"]),
+            text,
+        ]
+    )
+
+
+def decode_segment(view):
+    if len(view) < HEADER.size:
+        return None
+    magic, version, itemsize, text_size, groups, chars = HEADER.unpack_from(view)
+    if magic != MAGIC or version != FLATTEN_VERSION or itemsize != array("I").itemsize:
+        return None
+    if len(view) != HEADER.size + groups * (2 * itemsize + 1) + chars * itemsize + text_size:
+        return None
+    offset = HEADER.size
+    lines = _view_of("I", view[offset:offset + groups * itemsize])
+    offset += groups * itemsize
+    counts = _view_of("I", view[offset:offset + groups * itemsize])
+    offset += groups * itemsize
+    unsorted = _view_of("B", view[offset:offset + groups])
+    offset += groups
+    columns = _view_of("I", view[offset:offset + chars * itemsize])
+    offset += chars * itemsize
+    text = str(view[offset:offset + text_size], "utf-8")
+    return {"text": text, "lines": lines, "counts": counts, "columns": columns, "unsorted": unsorted}
+
+
+def release_segment(segment):
+    for value in segment.values():
+        if isinstance(value, memoryview):
+            value.release()
+
+
+class FlattenCache:
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(cache_dir)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, sha):
+        return self.directory / f"{sha}-v{FLATTEN_VERSION}.bin"
+
+    def get(self, sha, consume=copy_segment):
+        path = self.path_for(sha)
+        result = None
+        try:
+            with open(path, "rb") as handle:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                    segment = decode_segment(view)
+                    if segment is not None:
+                        try:
+                            result = consume(segment)
+                        finally:
+                            release_segment(segment)
+        except (FileNotFoundError, ValueError, UnicodeDecodeError):
+            result = None
+        if result is None:
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return result
+
+    def put(self, sha, segment):
+        path = self.path_for(sha)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_bytes(encode_segment(segment))
+        os.replace(temp_path, path)
+
+    def prune(self):
+        if self.max_bytes is None:
+            return
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+            total += stat.st_size
+        entries.sort()
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def close(self):
+        self.prune()
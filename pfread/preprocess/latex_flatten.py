@@ -1,8 +1,20 @@
 import hashlib
+import re
+from array import array
 from pathlib import Path
 
 from pfread.utils.offsets import OffsetIndex
 
+FLATTEN_VERSION = 3
+
+COMMENT_PATTERN = re.compile(r"(?<!\\)(?:\\\\)*%")
+KEEP_SPECIAL = re.compile(r"[\\{}]")
+SKIP_SPECIAL = re.compile(r"[{}]")
+OPTIONAL_SPECIAL = re.compile(r"[\[\]{}]")
+
+KEEP = "keep"
+SKIP = "skip"
+OPTIONAL = "optional"
 
 STYLE_COMMANDS = {
     "textbf",
@@ -101,7 +113,145 @@ def clean_line(line):
     return cleaned, mapping
 
 
-def flatten_sources(tex_files):
+def _argument_frame(command):
+    return [SKIP if command in {"begin", "end"} else KEEP, 0]
+
+
+def _close_optional(frames, line, position):
+    frame = frames.pop()
+    if frames:
+        frames[-1][1] += frame[2]
+    if position < len(line) and line[position] == "{":
+        frames.append(_argument_frame(frame[3]))
+        return position + 1
+    return position
+
+
+def _clean_continued_line(line, frames, pieces, mapping):
+    comment = COMMENT_PATTERN.search(line)
+    if comment is not None:
+        line = line[:comment.end() - 1]
+    length = len(line)
+    index = 0
+    while index < length:
+        frame = frames[-1] if frames else None
+        if frame is None or frame[0] == KEEP:
+            found = KEEP_SPECIAL.search(line, index)
+            stop = found.start() if found else length
+            if stop > index:
+                pieces.append(line[index:stop])
+                mapping.extend(range(index, stop))
+            if found is None:
+                break
+            char = line[stop]
+            if char == "\\":
+                end = stop + 1
+                while end < length and (line[end].isalpha() or line[end] == "@"):
+                    end += 1
+                command = line[stop + 1:end]
+                if end < length and line[end] == "[":
+                    frames.append([OPTIONAL, 0, 0, command])
+                    end += 1
+                elif end < length and line[end] == "{":
+                    frames.append(_argument_frame(command))
+                    end += 1
+                index = end
+                continue
+            if char == "{" and frame is not None:
+                frame[1] += 1
+            elif char == "}" and frame is not None:
+                if frame[1] == 0:
+                    frames.pop()
+                    index = stop + 1
+                    continue
+                frame[1] -= 1
+            pieces.append(char)
+            mapping.append(stop)
+            index = stop + 1
+        elif frame[0] == SKIP:
+            found = SKIP_SPECIAL.search(line, index)
+            if found is None:
+                break
+            index = found.end()
+            if found.group() == "{":
+                frame[1] += 1
+            elif frame[1] == 0:
+                frames.pop()
+            else:
+                frame[1] -= 1
+        else:
+            found = OPTIONAL_SPECIAL.search(line, index)
+            if found is None:
+                break
+            char = found.group()
+            index = found.end()
+            if char == "[":
+                frame[1] += 1
+            elif char == "]":
+                if frame[1] == 0:
+                    index = _close_optional(frames, line, index)
+                else:
+                    frame[1] -= 1
+            elif char == "{":
+                frame[2] += 1
+            elif frame[2] > 0:
+                frame[2] -= 1
+            elif len(frames) > 1:
+                enclosing = frames[-2]
+                if enclosing[1] == 0:
+                    del frames[-2:]
+                else:
+                    enclosing[1] -= 1
+    for position, frame in enumerate(frames):
+        if frame[0] == OPTIONAL:
+            del frames[position:]
+            break
+
+
+def clean_lines(lines):
+    frames = []
+    for line in lines:
+        if not line.strip():
+            frames.clear()
+        pieces = []
+        mapping = []
+        _clean_continued_line(line, frames, pieces, mapping)
+        yield "".join(pieces), mapping
+
+
+def flatten_content(content):
+    lines = content.splitlines()
+    if content.endswith("\n"):
+        lines.append("")
+    pieces = []
+    numbers = array("I")
+    counts = array("I")
+    columns = array("I")
+    unsorted = array("B")
+    for number, (line, (cleaned, mapping)) in enumerate(zip(lines, clean_lines(lines)), 1):
+        pieces.append(cleaned)
+        pieces.append("\n")
+        numbers.append(number)
+        counts.append(len(mapping) + 1)
+        columns.extend(mapping)
+        columns.append(len(line))
+        unsorted.append(mapping != sorted(mapping))
+    return {
+        "text": "".join(pieces),
+        "lines": numbers,
+        "counts": counts,
+        "columns": columns,
+        "unsorted": unsorted,
+    }
+
+
+def _add_segment(combined, index, path, segment):
+    combined.append(segment["text"])
+    index.extend_segment(path, segment["lines"], segment["counts"], segment["columns"], segment["unsorted"])
+    return True
+
+
+def flatten_sources(tex_files, cache=None):
     index = OffsetIndex()
     combined = []
     file_records = []
@@ -109,15 +259,12 @@ def flatten_sources(tex_files):
         content = Path(path).read_text(encoding="utf-8")
         sha = hashlib.sha1(content.encode("utf-8")).hexdigest()
         file_records.append({"path": str(path), "sha": sha, "text": content})
-        lines = content.splitlines()
-        if content.endswith("\n"):
-            lines.append("")
-        for number, line in enumerate(lines, 1):
-            cleaned, mapping = clean_line(line)
-            combined.append(cleaned)
-            index.extend_from_mapping(path, number, mapping)
-            combined.append("\n")
-            index.add_newline(path, number, len(line))
+        if cache is not None and cache.get(sha, lambda segment: _add_segment(combined, index, path, segment)):
+            continue
+        segment = flatten_content(content)
+        if cache is not None:
+            cache.put(sha, segment)
+        _add_segment(combined, index, path, segment)
     text = "".join(combined)
     return {
         "text": text,
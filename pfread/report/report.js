@@ -1,9 +1,56 @@
-async function loadFindings() {
-  const response = await fetch('findings.json');
-  if (!response.ok) {
-    throw new Error('Unable to load findings.json');
+const ROW_HEIGHT = 32;
+const OVERSCAN = 10;
+const PHASE_ORDER = ['typo', 'cross', 'paragraph', 'review'];
+
+const PFREAD = {
+  index: null,
+  shards: {},
+  waiting: {},
+  registerIndex(index) {
+    this.index = index;
+  },
+  registerShard(id, issues) {
+    this.shards[id] = issues;
+    const resolve = this.waiting[id];
+    if (resolve) {
+      delete this.waiting[id];
+      resolve(issues);
+    }
+  },
+};
+window.PFREAD = PFREAD;
+
+function loadScript(src) {
+  return new Promise((resolve, reject) => {
+    const script = document.createElement('script');
+    script.src = src;
+    script.onload = () => resolve();
+    script.onerror = () => reject(new Error(`Unable to load ${src}`));
+    document.head.appendChild(script);
+  });
+}
+
+async function loadIndex() {
+  await loadScript('findings/index.js');
+  if (!PFREAD.index) {
+    throw new Error('Unable to load findings/index.js');
+  }
+  return PFREAD.index;
+}
+
+const shardRequests = {};
+
+function loadShard(shard) {
+  if (PFREAD.shards[shard.id]) {
+    return Promise.resolve(PFREAD.shards[shard.id]);
+  }
+  if (!shardRequests[shard.id]) {
+    shardRequests[shard.id] = new Promise((resolve, reject) => {
+      PFREAD.waiting[shard.id] = resolve;
+      loadScript(shard.script).catch(reject);
+    });
   }
-  return await response.json();
+  return shardRequests[shard.id];
 }
 
 function populateOptions(select, values) {
@@ -22,7 +69,8 @@ function populateOptions(select, values) {
 
 function renderMeta(meta) {
   const container = document.getElementById('meta');
-  container.textContent = `Run ${meta.run_id} · Model ${meta.model} · Tokens ${meta.tokens} · Cost $${meta.cost_usd}`;
+  const cached = meta.cache_hits ? ` · Cached responses ${meta.cache_hits}` : '';
+  container.textContent = `Run ${meta.run_id} · Model ${meta.model} · Tokens ${meta.tokens}${cached} · Cost $${meta.cost_usd}`;
 }
 
 function renderReview(review) {
@@ -57,73 +105,229 @@ function renderReview(review) {
   });
 }
 
-function renderTable(issues) {
-  const tbody = document.querySelector('#issues-table tbody');
-  tbody.innerHTML = '';
-  issues.forEach((issue) => {
-    const row = document.createElement('tr');
-    row.dataset.issueId = issue.id;
-    row.innerHTML = `
-      <td>${issue.id}</td>
-      <td>${issue.phase}</td>
-      <td>${issue.type}</td>
-      <td>${issue.severity}</td>
-      <td>${issue.span.file}</td>
-      <td>${issue.span.line}</td>
-    `;
-    row.addEventListener('click', () => showDetails(issue));
-    tbody.appendChild(row);
+function renderSummary(totals) {
+  const container = document.getElementById('summary');
+  container.innerHTML = '';
+  const groups = [
+    ['Issues', { total: totals.issues || 0 }],
+    ['Phase', totals.phase || {}],
+    ['Severity', totals.severity || {}],
+  ];
+  groups.forEach(([title, counts]) => {
+    const block = document.createElement('div');
+    block.className = 'summary-group';
+    const heading = document.createElement('h3');
+    heading.textContent = title;
+    block.appendChild(heading);
+    Object.keys(counts).sort().forEach((key) => {
+      const item = document.createElement('span');
+      item.className = 'summary-count';
+      item.textContent = `${key}: ${counts[key]}`;
+      block.appendChild(item);
+    });
+    container.appendChild(block);
   });
 }
 
+function compareShards(left, right) {
+  if (left.file !== right.file) return left.file < right.file ? -1 : 1;
+  const phase = PHASE_ORDER.indexOf(left.phase) - PHASE_ORDER.indexOf(right.phase);
+  if (phase !== 0) return phase;
+  return left.part - right.part;
+}
+
+function currentFilters() {
+  return {
+    phase: document.getElementById('filter-phase').value,
+    type: document.getElementById('filter-type').value,
+    severity: document.getElementById('filter-severity').value,
+    file: document.getElementById('filter-file').value,
+  };
+}
+
+function selectShards(shards, filters) {
+  return shards
+    .filter((shard) => {
+      if (filters.phase && shard.phase !== filters.phase) return false;
+      if (filters.file && shard.file !== filters.file) return false;
+      if (filters.type && !shard.types[filters.type]) return false;
+      if (filters.severity && !shard.severities[filters.severity]) return false;
+      return true;
+    })
+    .sort(compareShards);
+}
+
+function applyFilters(issues, filters) {
+  return issues.filter((issue) => {
+    if (filters.type && issue.type !== filters.type) return false;
+    if (filters.severity && issue.severity !== filters.severity) return false;
+    return true;
+  });
+}
+
+// Rows are described by segments of consecutive shards. Without a type or
+// severity filter the shard counts give every row position up front, so
+// shards are only loaded once their rows scroll into view.
+function lazyRows(shards) {
+  const segments = [];
+  let total = 0;
+  shards.forEach((shard) => {
+    segments.push({ shard, start: total });
+    total += shard.count;
+  });
+  return {
+    total,
+    rowAt(position) {
+      let low = 0;
+      let high = segments.length - 1;
+      while (low < high) {
+        const middle = (low + high + 1) >> 1;
+        if (segments[middle].start <= position) low = middle;
+        else high = middle - 1;
+      }
+      const segment = segments[low];
+      const issues = PFREAD.shards[segment.shard.id];
+      if (!issues) {
+        loadShard(segment.shard)
+          .then(() => table.render())
+          .catch((error) => {
+            delete shardRequests[segment.shard.id];
+            showError(error);
+          });
+        return null;
+      }
+      return issues[position - segment.start];
+    },
+  };
+}
+
+function loadedRows(issues) {
+  return {
+    total: issues.length,
+    rowAt(position) {
+      return issues[position];
+    },
+  };
+}
+
+const table = {
+  rows: loadedRows([]),
+  setRows(rows) {
+    this.rows = rows;
+    document.getElementById('issues-viewport').scrollTop = 0;
+    this.render();
+  },
+  render() {
+    const viewport = document.getElementById('issues-viewport');
+    const tbody = document.querySelector('#issues-table tbody');
+    const total = this.rows.total;
+    const first = Math.max(Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN, 0);
+    const visible = Math.ceil(viewport.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN;
+    const last = Math.min(first + visible, total);
+    tbody.innerHTML = '';
+    tbody.appendChild(spacerRow(first * ROW_HEIGHT));
+    for (let position = first; position < last; position += 1) {
+      tbody.appendChild(issueRow(this.rows.rowAt(position)));
+    }
+    tbody.appendChild(spacerRow((total - last) * ROW_HEIGHT));
+    document.getElementById('issues-count').textContent = `${total} issues`;
+  },
+};
+
+function spacerRow(height) {
+  const row = document.createElement('tr');
+  row.className = 'spacer';
+  const cell = document.createElement('td');
+  cell.colSpan = 6;
+  cell.style.height = `${height}px`;
+  row.appendChild(cell);
+  return row;
+}
+
+function issueRow(issue) {
+  const row = document.createElement('tr');
+  if (!issue) {
+    row.className = 'loading';
+    const cell = document.createElement('td');
+    cell.colSpan = 6;
+    cell.textContent = 'Loading…';
+    row.appendChild(cell);
+    return row;
+  }
+  row.dataset.issueId = issue.id;
+  [issue.id, issue.phase, issue.type, issue.severity, issue.span.file, issue.span.line].forEach((value) => {
+    const cell = document.createElement('td');
+    cell.textContent = value;
+    row.appendChild(cell);
+  });
+  row.addEventListener('click', () => showDetails(issue));
+  return row;
+}
+
 function showDetails(issue) {
   document.getElementById('excerpt').textContent = issue.excerpt || '';
   document.getElementById('suggestion').textContent = issue.suggestion || '';
   document.getElementById('explanation').textContent = issue.explanation || '';
 }
 
-function applyFilters(issues) {
-  const phase = document.getElementById('filter-phase').value;
-  const type = document.getElementById('filter-type').value;
-  const severity = document.getElementById('filter-severity').value;
-  const file = document.getElementById('filter-file').value;
-  return issues.filter((issue) => {
-    if (phase && issue.phase !== phase) return false;
-    if (type && issue.type !== type) return false;
-    if (severity && issue.severity !== severity) return false;
-    if (file && issue.span.file !== file) return false;
-    return true;
-  });
+let filterGeneration = 0;
+
+async function refreshTable(index) {
+  const filters = currentFilters();
+  const shards = selectShards(index.shards || [], filters);
+  const generation = ++filterGeneration;
+  if (!filters.type && !filters.severity) {
+    table.setRows(lazyRows(shards));
+    return;
+  }
+  table.setRows(loadedRows([]));
+  const loaded = await Promise.all(shards.map(loadShard));
+  if (generation !== filterGeneration) return;
+  table.setRows(loadedRows(applyFilters([].concat(...loaded), filters)));
 }
 
-function setupFilters(issues) {
+function setupFilters(index) {
+  const totals = index.totals || {};
   const phaseSelect = document.getElementById('filter-phase');
   const typeSelect = document.getElementById('filter-type');
   const severitySelect = document.getElementById('filter-severity');
   const fileSelect = document.getElementById('filter-file');
-  populateOptions(phaseSelect, Array.from(new Set(issues.map((i) => i.phase))));
-  populateOptions(typeSelect, Array.from(new Set(issues.map((i) => i.type))));
-  populateOptions(severitySelect, Array.from(new Set(issues.map((i) => i.severity))));
-  populateOptions(fileSelect, Array.from(new Set(issues.map((i) => i.span.file))));
+  populateOptions(phaseSelect, Object.keys(totals.phase || {}));
+  populateOptions(typeSelect, Object.keys(totals.type || {}));
+  populateOptions(severitySelect, Object.keys(totals.severity || {}));
+  populateOptions(fileSelect, Object.keys(totals.file || {}));
   [phaseSelect, typeSelect, severitySelect, fileSelect].forEach((select) => {
     select.addEventListener('change', () => {
-      const filtered = applyFilters(issues);
-      renderTable(filtered);
+      refreshTable(index).catch(showError);
     });
   });
 }
 
+function showError(error) {
+  const meta = document.getElementById('meta');
+  meta.textContent = error.message;
+}
+
 async function init() {
   try {
-    const data = await loadFindings();
-    const issues = data.issues || [];
-    renderMeta(data.meta || {});
-    renderReview(data.review || {});
-    renderTable(issues);
-    setupFilters(issues);
+    const index = await loadIndex();
+    renderMeta(index.meta || {});
+    renderSummary(index.totals || {});
+    renderReview(index.review || {});
+    setupFilters(index);
+    const viewport = document.getElementById('issues-viewport');
+    let scheduled = false;
+    viewport.addEventListener('scroll', () => {
+      if (scheduled) return;
+      scheduled = true;
+      window.requestAnimationFrame(() => {
+        scheduled = false;
+        table.render();
+      });
+    });
+    await refreshTable(index);
   } catch (error) {
-    const meta = document.getElementById('meta');
-    meta.textContent = error.message;
+    showError(error);
   }
 }
 
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+
+def cache_key(backend, model, system, user, temperature, max_tokens):
+    material = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "backend": backend,
+            "model": model,
+            "system": system,
+            "user": user,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.path = Path(cache_dir) / "responses.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._connection.commit()
+        self.prune()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.max_age is not None and now - created > self.max_age:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._connection.commit()
+                return None
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+        return json.loads(value)
+
+    def put(self, key, payload):
+        value = json.dumps(payload, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._connection.commit()
+
+    def prune(self):
+        with self._lock:
+            if self.max_age is not None:
+                cutoff = time.time() - self.max_age
+                self._connection.execute("DELETE FROM responses WHERE created < ?", (cutoff,))
+            if self.max_bytes is not None:
+                total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    rows = self._connection.execute(
+                        "SELECT key, size FROM responses ORDER BY accessed ASC"
+                    ).fetchall()
+                    evicted = []
+                    for key, size in rows:
+                        if total <= self.max_bytes:
+                            break
+                        evicted.append((key,))
+                        total -= size
+                    self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+            self._connection.commit()
+
+    def close(self):
+        self.prune()
+        with self._lock:
+            self._connection.close()
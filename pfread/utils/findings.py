@@ -0,0 +1,96 @@
+import json
+import os
+from pathlib import Path
+
+from pfread.utils.schema import StableIdAssigner, issue_from_dict
+
+ISSUES_PLACEHOLDER = "\0pfread-issues\0"
+
+
+class IssueSpool:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.count = 0
+        self._handle = open(self.path, "w", encoding="utf-8")
+
+    def push(self, issue):
+        self._handle.write(json.dumps(issue.to_dict(), ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def extend(self, issues):
+        for issue in issues:
+            self.push(issue)
+
+    def close(self):
+        self._handle.close()
+
+
+class FindingsSink:
+    def __init__(self, jsonl_path, order):
+        self.path = Path(jsonl_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.order = list(order)
+        self.spools = {
+            name: IssueSpool(self.path.with_name("%s.%s.spool" % (self.path.stem, name))) for name in self.order
+        }
+        self.count = 0
+
+    def spool(self, name):
+        return self.spools[name]
+
+    def close(self):
+        assigner = StableIdAssigner()
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as output:
+            for name in self.order:
+                spool = self.spools[name]
+                spool.close()
+                with open(spool.path, encoding="utf-8") as handle:
+                    for line in handle:
+                        issue = assigner.assign(issue_from_dict(json.loads(line)))
+                        output.write(json.dumps(issue.to_dict(), ensure_ascii=False) + "\n")
+                        self.count += 1
+                spool.path.unlink()
+        os.replace(temp_path, self.path)
+        return self.count
+
+
+class FindingsView:
+    def __init__(self, jsonl_path, count):
+        self.path = Path(jsonl_path)
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for data in iter_findings(self.path):
+            yield issue_from_dict(data)
+
+
+def iter_findings(jsonl_path):
+    with open(jsonl_path, encoding="utf-8") as handle:
+        for line in handle:
+            yield json.loads(line)
+
+
+def write_findings_json(json_path, meta, files, issue_dicts, review):
+    layout = json.dumps(
+        {"meta": meta, "files": files, "issues": [ISSUES_PLACEHOLDER], "review": review},
+        indent=2,
+        ensure_ascii=False,
+    )
+    marker = json.dumps(ISSUES_PLACEHOLDER, ensure_ascii=False)
+    prefix, suffix = layout.split(marker)
+    json_path = Path(json_path)
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(json_path, "w", encoding="utf-8") as output:
+        written = 0
+        for data in issue_dicts:
+            output.write(prefix if not written else ",\n    ")
+            output.write(json.dumps(data, indent=2, ensure_ascii=False).replace("\n", "\n    "))
+            written += 1
+        if written:
+            output.write(suffix)
+        else:
+            output.write(prefix.rstrip() + suffix.lstrip())
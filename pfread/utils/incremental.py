@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from pfread.utils import io
+
+STATE_VERSION = 2
+HEADER_FIELDS = ("model", "backend", "prompts")
+
+
+def fingerprint(kind, text):
+    return hashlib.sha1(("%s\0%s" % (kind, text)).encode("utf-8")).hexdigest()
+
+
+def state_path_for(json_path):
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.stem + ".state.json")
+
+
+class UnitState:
+    def __init__(self, model, previous=None, backend="", prompts="", discarded=None):
+        self.model = model
+        self.backend = backend
+        self.prompts = prompts
+        self.discarded = discarded
+        self.previous = previous or {}
+        self.current = {}
+        self.reused = 0
+        self.checked = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, kind, text):
+        return self.previous.get(kind, {}).get(fingerprint(kind, text))
+
+    def record(self, kind, text, response):
+        with self._lock:
+            self.current.setdefault(kind, {})[fingerprint(kind, text)] = response
+
+    def resolve(self, kind, texts, compute):
+        responses = [None] * len(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            response = self.lookup(kind, text)
+            if response is None:
+                pending.append(index)
+            else:
+                responses[index] = response
+        fresh = compute(pending) if pending else []
+        for index, response in zip(pending, fresh):
+            responses[index] = response
+        for text, response in zip(texts, responses):
+            self.record(kind, text, response)
+        with self._lock:
+            self.reused += len(texts) - len(pending)
+            self.checked += len(pending)
+        return responses
+
+    def to_payload(self):
+        units = {kind: entries for kind, entries in self.previous.items() if kind not in self.current}
+        units.update(self.current)
+        return {
+            "version": STATE_VERSION,
+            "model": self.model,
+            "backend": self.backend,
+            "prompts": self.prompts,
+            "units": units,
+        }
+
+
+def load_state(path, model, backend="", prompts=""):
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return UnitState(model, backend=backend, prompts=prompts)
+    expected = {"model": model, "backend": backend, "prompts": prompts}
+    if data.get("version") != STATE_VERSION:
+        return UnitState(model, backend=backend, prompts=prompts, discarded="version")
+    for field in HEADER_FIELDS:
+        if data.get(field) != expected[field]:
+            return UnitState(model, backend=backend, prompts=prompts, discarded=field)
+    return UnitState(model, data.get("units", {}), backend=backend, prompts=prompts)
+
+
+def save_state(path, state):
+    io.write_json(path, state.to_payload())
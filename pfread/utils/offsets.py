@@ -1,3 +1,6 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 
 
@@ -8,23 +11,117 @@ class OffsetEntry:
     column: int
 
 
+class LineTable:
+    def __init__(self, text):
+        starts = [0]
+        position = text.find("\n")
+        while position != -1:
+            starts.append(position + 1)
+            position = text.find("\n", position + 1)
+        self.starts = starts
+
+    def location(self, position):
+        index = bisect_right(self.starts, position) - 1
+        return index + 1, position - self.starts[index]
+
+
+class _EntryView:
+    def __init__(self, index):
+        self._index = index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._index.entry_at(item) for item in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if position < 0 or position >= len(self):
+            raise IndexError("offset index out of range")
+        return self._index.entry_at(position)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self._index.entry_at(position)
+
+
 class OffsetIndex:
     def __init__(self):
-        self.entries = []
+        self.files = []
+        self._file_ids = {}
+        self._file_run_starts = []
+        self._file_run_ids = []
+        self._lines = array("I")
+        self._columns = array("I")
+        self._line_runs = {}
+        self._unsorted_lines = set()
+        self.entries = _EntryView(self)
 
     def __len__(self):
-        return len(self.entries)
+        return len(self._columns)
+
+    def _intern(self, file_path):
+        file_path = str(file_path)
+        file_id = self._file_ids.get(file_path)
+        if file_id is None:
+            file_id = len(self.files)
+            self.files.append(file_path)
+            self._file_ids[file_path] = file_id
+        return file_id
+
+    def _mark_run(self, file_id, line, position, count):
+        if not self._file_run_ids or self._file_run_ids[-1] != file_id:
+            self._file_run_starts.append(position)
+            self._file_run_ids.append(file_id)
+        key = (file_id, line)
+        runs = self._line_runs.get(key)
+        if runs is not None and runs[-1][1] == position:
+            if self._columns[position - 1] > self._columns[position]:
+                self._unsorted_lines.add(key)
+            runs[-1][1] = position + count
+        elif runs is None:
+            self._line_runs[key] = [[position, position + count]]
+        else:
+            runs.append([position, position + count])
+        return key
+
+    def _append_run(self, file_id, line, columns):
+        position = len(self._columns)
+        count = len(columns)
+        if not count:
+            return
+        self._columns.extend(columns)
+        self._lines.extend(array("I", [line]) * count)
+        key = self._mark_run(file_id, line, position, count)
+        if count > 1 and columns.tolist() != sorted(columns):
+            self._unsorted_lines.add(key)
+
+    def extend_segment(self, file_path, lines, counts, columns, unsorted):
+        file_id = self._intern(file_path)
+        position = len(self._columns)
+        self._columns.frombytes(memoryview(columns).cast("B"))
+        for line, count, disorder in zip(lines, counts, unsorted):
+            if not count:
+                continue
+            key = self._mark_run(file_id, line, position, count)
+            if disorder:
+                self._unsorted_lines.add(key)
+            self._lines.extend(array("I", [line]) * count)
+            position += count
 
     def add(self, file_path, line, column):
-        self.entries.append(OffsetEntry(str(file_path), line, column))
+        self._append_run(self._intern(file_path), line, array("I", [column]))
 
     def extend_from_mapping(self, file_path, line, mapping):
-        for column in mapping:
-            self.add(file_path, line, column)
+        self._append_run(self._intern(file_path), line, array("I", mapping))
 
     def add_newline(self, file_path, line, column):
         self.add(file_path, line, column)
 
+    def entry_at(self, position):
+        return OffsetEntry(self.file_at(position), self._lines[position], self._columns[position])
+
     def global_range(self, file_path, line, column, length):
         start = self._find_position(file_path, line, column)
         if start is None:
@@ -35,40 +132,66 @@ class OffsetIndex:
             end = start + length
         return (start, max(end, start + length))
 
-    def _find_position(self, file_path, line, column):
-        for idx, entry in enumerate(self.entries):
-            if entry.file == str(file_path) and entry.line == line and entry.column >= column:
+    def _first_in_line(self, file_path, line, column, exact):
+        file_id = self._file_ids.get(str(file_path))
+        if file_id is None:
+            return None
+        key = (file_id, line)
+        runs = self._line_runs.get(key)
+        if runs is None:
+            return None
+        columns = self._columns
+        if key in self._unsorted_lines:
+            for start, end in runs:
+                for idx in range(start, end):
+                    value = columns[idx]
+                    if value == column or (not exact and value > column):
+                        return idx
+            return None
+        for start, end in runs:
+            idx = bisect_left(columns, column, start, end)
+            if idx < end and (not exact or columns[idx] == column):
                 return idx
         return None
 
+    def _find_position(self, file_path, line, column):
+        return self._first_in_line(file_path, line, column, exact=False)
+
     def global_from_local(self, file_path, line, column):
-        for idx, entry in enumerate(self.entries):
-            if entry.file == str(file_path) and entry.line == line and entry.column == column:
-                return idx
-        return None
+        return self._first_in_line(file_path, line, column, exact=True)
 
     def span_for(self, start, end):
-        if not self.entries:
+        if not len(self):
             return None
-        length = len(self.entries)
+        length = len(self)
         left = min(max(start, 0), length - 1)
         right_index = min(max(end - 1, 0), length - 1)
-        start_entry = self.entries[left]
-        end_entry = self.entries[right_index]
         return {
-            "file": start_entry.file,
+            "file": self.file_at(left),
             "start": start,
             "end": end,
-            "line": start_entry.line,
-            "end_line": end_entry.line,
+            "line": self._lines[left],
+            "end_line": self._lines[right_index],
         }
 
     def line_at(self, position):
-        if position < 0 or position >= len(self.entries):
+        if position < 0 or position >= len(self):
             return 0
-        return self.entries[position].line
+        return self._lines[position]
 
     def file_at(self, position):
-        if position < 0 or position >= len(self.entries):
+        if position < 0 or position >= len(self):
             return ""
-        return self.entries[position].file
+        run = bisect_right(self._file_run_starts, position) - 1
+        return self.files[self._file_run_ids[run]]
+
+    def memory_footprint(self):
+        total = sys.getsizeof(self._lines) + sys.getsizeof(self._columns)
+        total += sys.getsizeof(self.files) + sum(sys.getsizeof(path) for path in self.files)
+        total += sys.getsizeof(self._file_ids)
+        total += sys.getsizeof(self._file_run_starts) + sys.getsizeof(self._file_run_ids)
+        total += sys.getsizeof(self._line_runs) + sys.getsizeof(self._unsorted_lines)
+        for key, runs in self._line_runs.items():
+            total += sys.getsizeof(key) + sys.getsizeof(runs)
+            total += sum(sys.getsizeof(run) for run in runs)
+        return total
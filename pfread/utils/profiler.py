@@ -0,0 +1,193 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from pfread.utils import io
+
+PROFILE_INTERVAL = 0.005
+HOT_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+IDLE_FILES = tuple(
+    os.path.normcase(path)
+    for path in (
+        threading.__file__,
+        os.path.join(os.path.dirname(threading.__file__), "queue.py"),
+        os.path.join(os.path.dirname(threading.__file__), "selectors.py"),
+        os.path.join(os.path.dirname(threading.__file__), "concurrent", "futures", "_base.py"),
+        os.path.join(os.path.dirname(threading.__file__), "concurrent", "futures", "thread.py"),
+    )
+)
+
+
+def profile_stage(profiler, name):
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name)
+
+
+def frame_key(code):
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def short_path(path):
+    for root in sorted(sys.path, key=len, reverse=True):
+        if root and path.startswith(root + os.sep):
+            return path[len(root) + 1:]
+    return path
+
+
+class StageProfiler:
+    def __init__(self, interval=PROFILE_INTERVAL, top=HOT_FUNCTIONS):
+        self.interval = interval
+        self.top = top
+        self.stages = []
+        self.samples = 0
+        self.sampler_seconds = 0.0
+        self._current = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._owns_tracemalloc = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._thread = threading.Thread(target=self._sample_loop, name="pfread-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            with self._lock:
+                current = self._current
+            if current is not None:
+                self._sample(current, own)
+            self.sampler_seconds += time.perf_counter() - started
+
+    def _sample(self, current, own):
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            if os.path.normcase(frame.f_code.co_filename) in IDLE_FILES:
+                current["idle_samples"] += 1
+                continue
+            current["samples"] += 1
+            self.samples += 1
+            leaf = frame_key(frame.f_code)
+            current["self"][leaf] = current["self"].get(leaf, 0) + 1
+            seen = set()
+            while frame is not None:
+                key = frame_key(frame.f_code)
+                if key not in seen:
+                    seen.add(key)
+                    current["total"][key] = current["total"].get(key, 0) + 1
+                frame = frame.f_back
+
+    @contextmanager
+    def stage(self, name):
+        current = {"name": name, "samples": 0, "idle_samples": 0, "self": {}, "total": {}}
+        before = tracemalloc.take_snapshot()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        with self._lock:
+            self._current = current
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            current["wall_ms"] = (time.perf_counter() - wall) * 1000.0
+            current["cpu_ms"] = (time.process_time() - cpu) * 1000.0
+            with self._lock:
+                self._current = None
+            end_memory, peak_memory = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            current["start_memory"] = start_memory
+            current["end_memory"] = end_memory
+            current["peak_memory"] = peak_memory
+            current["allocations"] = after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]
+            self.stages.append(current)
+
+    def hot_functions(self, current):
+        samples = current["samples"] or 1
+        ranked = sorted(current["total"].items(), key=lambda item: (-current["self"].get(item[0], 0), -item[1]))
+        rows = []
+        for (path, line, name), total in ranked[: self.top]:
+            own = current["self"].get((path, line, name), 0)
+            rows.append(
+                {
+                    "function": name,
+                    "file": short_path(path),
+                    "line": line,
+                    "self_samples": own,
+                    "total_samples": total,
+                    "self_pct": round(100.0 * own / samples, 1),
+                    "total_pct": round(100.0 * total / samples, 1),
+                }
+            )
+        return rows
+
+    def report(self):
+        stages = []
+        for current in self.stages:
+            allocations = [
+                {
+                    "location": "%s:%d" % (short_path(stat.traceback[0].filename), stat.traceback[0].lineno),
+                    "size_bytes": stat.size_diff,
+                    "count": stat.count_diff,
+                }
+                for stat in current["allocations"]
+            ]
+            stages.append(
+                {
+                    "name": current["name"],
+                    "wall_ms": round(current["wall_ms"], 3),
+                    "cpu_ms": round(current["cpu_ms"], 3),
+                    "samples": current["samples"],
+                    "idle_samples": current["idle_samples"],
+                    "memory": {
+                        "start_bytes": current["start_memory"],
+                        "end_bytes": current["end_memory"],
+                        "peak_bytes": current["peak_memory"],
+                        "peak_growth_bytes": current["peak_memory"] - current["start_memory"],
+                    },
+                    "hot_functions": self.hot_functions(current),
+                    "top_allocations": allocations,
+                }
+            )
+        return {
+            "interval_ms": self.interval * 1000.0,
+            "samples": self.samples,
+            "sampler_ms": round(self.sampler_seconds * 1000.0, 3),
+            "stages": stages,
+        }
+
+    def summary(self, report):
+        stages = {}
+        for entry in report["stages"]:
+            hot = entry["hot_functions"]
+            stages[entry["name"]] = {
+                "wall_ms": entry["wall_ms"],
+                "cpu_ms": entry["cpu_ms"],
+                "peak_growth_bytes": entry["memory"]["peak_growth_bytes"],
+                "top_function": "%s (%s:%d)" % (hot[0]["function"], hot[0]["file"], hot[0]["line"]) if hot else "",
+            }
+        return {"samples": report["samples"], "sampler_ms": report["sampler_ms"], "stages": stages}
+
+    def write(self, path):
+        report = self.report()
+        io.write_json(path, report)
+        return self.summary(report)
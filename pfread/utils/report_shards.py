@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+SHARD_DIR = "findings"
+SHARD_SIZE = 2000
+MAX_OPEN_SHARDS = 64
+
+
+def _count(counter, key):
+    counter[key] = counter.get(key, 0) + 1
+
+
+class _ShardWriter:
+    def __init__(self, directory):
+        self.directory = directory
+        self.shards = []
+        self.current = {}
+        self.handles = {}
+
+    def _open(self, shard):
+        handle = self.handles.pop(shard["id"], None)
+        if handle is None:
+            if len(self.handles) >= MAX_OPEN_SHARDS:
+                oldest = next(iter(self.handles))
+                self.handles.pop(oldest).close()
+            handle = open(self.directory / Path(shard["script"]).name, "a", encoding="utf-8")
+        self.handles[shard["id"]] = handle
+        return handle
+
+    def _close(self, shard):
+        handle = self._open(shard)
+        handle.write("]);\n")
+        handle.close()
+        del self.handles[shard["id"]]
+
+    def _start(self, file_path, phase, part):
+        shard_id = "s%05d" % (len(self.shards) + 1)
+        shard = {
+            "id": shard_id,
+            "file": file_path,
+            "phase": phase,
+            "part": part,
+            "count": 0,
+            "script": "%s/shard-%s.js" % (SHARD_DIR, shard_id),
+            "types": {},
+            "severities": {},
+        }
+        self.shards.append(shard)
+        with open(self.directory / Path(shard["script"]).name, "w", encoding="utf-8") as handle:
+            handle.write("PFREAD.registerShard(%s, [\n" % json.dumps(shard_id))
+        return shard
+
+    def push(self, data):
+        key = (data["span"]["file"], data["phase"])
+        shard = self.current.get(key)
+        if shard is not None and shard["count"] >= SHARD_SIZE:
+            self._close(shard)
+            shard = self._start(key[0], key[1], shard["part"] + 1)
+            self.current[key] = shard
+        elif shard is None:
+            shard = self._start(key[0], key[1], 1)
+            self.current[key] = shard
+        self._open(shard).write(json.dumps(data, ensure_ascii=False) + ",\n")
+        shard["count"] += 1
+        _count(shard["types"], data["type"])
+        _count(shard["severities"], data["severity"])
+
+    def close(self):
+        for shard in self.current.values():
+            self._close(shard)
+        return self.shards
+
+
+def write_report_shards(report_dir, meta, files, issue_dicts, review):
+    directory = Path(report_dir) / SHARD_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob("*.js"):
+        stale.unlink()
+    writer = _ShardWriter(directory)
+    totals = {"issues": 0, "phase": {}, "severity": {}, "type": {}, "file": {}}
+    for data in issue_dicts:
+        writer.push(data)
+        totals["issues"] += 1
+        _count(totals["phase"], data["phase"])
+        _count(totals["severity"], data["severity"])
+        _count(totals["type"], data["type"])
+        _count(totals["file"], data["span"]["file"])
+    index = {
+        "meta": meta,
+        "files": files,
+        "review": review,
+        "totals": totals,
+        "shards": writer.close(),
+    }
+    index_path = directory / "index.js"
+    index_path.write_text("PFREAD.registerIndex(%s);\n" % json.dumps(index, ensure_ascii=False), encoding="utf-8")
+    return index
@@ -0,0 +1,131 @@
+import random
+import threading
+import time
+import urllib.error
+
+TRANSIENT = "transient"
+RATE_LIMITED = "rate_limited"
+PERMANENT = "permanent"
+ERROR_CLASSES = (TRANSIENT, RATE_LIMITED, PERMANENT)
+TRANSIENT_STATUSES = {408, 409, 425, 500, 502, 503, 504}
+BACKOFF_BASE = 0.05
+BACKOFF_CAP = 8.0
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+
+class DeadlineExceeded(RuntimeError):
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def classify_error(error):
+    if isinstance(error, CircuitOpenError):
+        return TRANSIENT
+    status = getattr(error, "status", None)
+    if status == 429:
+        return RATE_LIMITED
+    if status is not None:
+        return TRANSIENT if status in TRANSIENT_STATUSES or status >= 500 else PERMANENT
+    if isinstance(error, (TimeoutError, ConnectionError, urllib.error.URLError)):
+        return TRANSIENT
+    return PERMANENT
+
+
+def backoff_delay(attempt, rng, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    return rng.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        if not self.threshold:
+            return
+        with self._lock:
+            if self.state == "closed":
+                return
+            waited = self.clock() - self.opened_at
+            if self.state == "open" and waited >= self.cooldown:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open":
+                if not self._probing:
+                    self._probing = True
+                    return
+                raise CircuitOpenError("LLM request failed: circuit half-open, waiting for the probe request")
+            cooldown = max(self.cooldown - waited, 0.0)
+            raise CircuitOpenError(
+                f"LLM request failed: circuit open after {self.failures} consecutive failures, "
+                f"retrying in {cooldown:.1f}s",
+                retry_after=cooldown,
+            )
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        if not self.threshold:
+            return False
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+                self.state = "open"
+                self.opened_at = self.clock()
+                self.opens += 1
+                self._probing = False
+                return True
+            return False
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_retries=2,
+        call_deadline=None,
+        run_deadline=None,
+        breaker=None,
+        seed=None,
+        sleep=time.sleep,
+        clock=time.monotonic,
+    ):
+        self.max_retries = max_retries
+        self.call_deadline = call_deadline
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.rng = random.Random(seed)
+        self.sleep = sleep
+        self.clock = clock
+        self.run_expires = clock() + run_deadline if run_deadline else None
+
+    def expires(self):
+        candidates = [self.run_expires]
+        if self.call_deadline:
+            candidates.append(self.clock() + self.call_deadline)
+        candidates = [value for value in candidates if value is not None]
+        return min(candidates) if candidates else None
+
+    def remaining(self, expires):
+        return None if expires is None else expires - self.clock()
+
+    def delay(self, error, attempt):
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None and (classify_error(error) == RATE_LIMITED or isinstance(error, CircuitOpenError)):
+            return retry_after + self.rng.uniform(0.0, BACKOFF_BASE)
+        return backoff_delay(attempt, self.rng)
@@ -0,0 +1,57 @@
+import re
+
+SCOPED_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+
+
+def _scoped(pattern):
+    flags = "".join(letter for flag, letter in SCOPED_FLAGS if pattern.flags & flag)
+    if flags:
+        return "(?%s:%s)" % (flags, pattern.pattern)
+    return "(?:%s)" % pattern.pattern
+
+
+class MultiPatternScanner:
+    def __init__(self):
+        self.rules = []
+
+    def register(self, pattern, handler, first=None):
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        self.rules.append((pattern, handler, first))
+
+    def _combined(self):
+        alternatives = [_scoped(pattern) for pattern, _, _ in self.rules]
+        captures = "".join("(?=(?P<r%d>%s)?)" % (index, item) for index, item in enumerate(alternatives))
+        hints = [first for _, _, first in self.rules]
+        # A leading character class lets the regex engine skip ahead to
+        # candidate positions; the one-character lookbehind then re-anchors
+        # the per-rule captures at the start of that character.
+        leading = "[%s]" % "".join(hints) if all(hints) else r"[\s\S]"
+        return re.compile(r"%s(?<=(?=%s)%s[\s\S])" % (leading, "|".join(alternatives), captures))
+
+    def scan(self, text):
+        if not self.rules:
+            return
+        combined = self._combined()
+        groups = [combined.groupindex["r%d" % index] for index in range(len(self.rules))]
+        hint_patterns = [re.compile("[%s]" % first) if first else None for _, _, first in self.rules]
+        candidates = {}
+        next_allowed = [0] * len(self.rules)
+        for hit in combined.finditer(text):
+            position = hit.start()
+            char = text[position]
+            indices = candidates.get(char)
+            if indices is None:
+                indices = [
+                    index
+                    for index, hint in enumerate(hint_patterns)
+                    if hint is None or hint.match(char)
+                ]
+                candidates[char] = indices
+            for index in indices:
+                if position < next_allowed[index] or hit.start(groups[index]) == -1:
+                    continue
+                pattern, handler, _ = self.rules[index]
+                match = pattern.match(text, position)
+                next_allowed[index] = max(match.end(), position + 1)
+                handler(match)
@@ -0,0 +1,29 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def _run_timed(name, run, results, telemetry):
+    if telemetry is not None:
+        telemetry.start_timer(name)
+    try:
+        return run(results)
+    finally:
+        if telemetry is not None:
+            telemetry.stop_timer(name)
+
+
+def run_pass_graph(tasks, telemetry=None, workers=None):
+    pending = {name: (set(after), run) for name, after, run in tasks}
+    results = {}
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers or max(len(pending), 1)) as pool:
+        while pending or running:
+            ready = [name for name, (after, _) in pending.items() if after <= results.keys()]
+            for name in ready:
+                _, run = pending.pop(name)
+                running[pool.submit(_run_timed, name, run, dict(results), telemetry)] = name
+            if not running:
+                raise ValueError("Unresolvable pass dependencies: %s" % ", ".join(sorted(pending)))
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results
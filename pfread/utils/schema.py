@@ -1,7 +1,13 @@
+import hashlib
 import json
+import re
 from dataclasses import dataclass, field
 
 
+STABLE_ID_LENGTH = 12
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
 @dataclass
 class Span:
     file: str
@@ -70,14 +76,37 @@ def issue_from_dict(data):
     )
 
 
-class IssueIdGenerator:
+def normalize_excerpt(text):
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def stable_issue_key(issue):
+    anchor = normalize_excerpt(issue.excerpt)
+    if not anchor:
+        anchor = normalize_excerpt(issue.suggestion + " " + issue.explanation)
+    material = "\0".join([issue.phase, issue.type, issue.span.file, anchor])
+    return "ISS-" + hashlib.sha1(material.encode("utf-8")).hexdigest()[:STABLE_ID_LENGTH]
+
+
+# Suffixes follow the order issues are passed in. run_cli streams them pass by pass in
+# output order, so the first duplicate in findings.jsonl keeps the bare ID.
+class StableIdAssigner:
     def __init__(self):
-        self.counter = 1
+        self._seen = {}
+
+    def assign(self, issue):
+        base = stable_issue_key(issue)
+        occurrence = self._seen.get(base, 0) + 1
+        self._seen[base] = occurrence
+        issue.id = base if occurrence == 1 else "%s-%d" % (base, occurrence)
+        return issue
+
 
-    def next_id(self):
-        value = self.counter
-        self.counter += 1
-        return "ISS-%06d" % value
+def assign_stable_ids(issues):
+    assigner = StableIdAssigner()
+    for issue in issues:
+        assigner.assign(issue)
+    return issues
 
 
 def validate_issue(issue):
@@ -1,4 +1,8 @@
+import json
+import threading
 import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
 
 
 PRICING = {
@@ -6,6 +10,26 @@ PRICING = {
 }
 
 
+PERCENTILES = (50, 90, 99)
+
+
+def estimate_tokens(text):
+    return len(text.split())
+
+
+def percentile(sorted_values, rank):
+    if not sorted_values:
+        return 0.0
+    index = -(-rank * len(sorted_values) // 100) - 1
+    return sorted_values[min(max(index, 0), len(sorted_values) - 1)]
+
+
+def stage(telemetry, name, category="stage", **args):
+    if telemetry is None:
+        return nullcontext()
+    return telemetry.span(name, category, **args)
+
+
 class Telemetry:
     def __init__(self):
         self.records = []
@@ -13,37 +37,147 @@ class Telemetry:
         self.cost = 0.0
         self.model = ""
         self.timings = {}
+        self.counters = {}
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._threads = {}
+        self._lock = threading.Lock()
 
     def record_completion(self, model, prompt_tokens, completion_tokens):
         pricing = PRICING.get(model, {"input": 0.0, "output": 0.0})
         cost = (prompt_tokens / 1000.0) * pricing["input"]
         cost += (completion_tokens / 1000.0) * pricing["output"]
-        self.records.append(
-            {
-                "model": model,
-                "prompt_tokens": prompt_tokens,
-                "completion_tokens": completion_tokens,
-                "cost": cost,
-            }
-        )
-        self.tokens += prompt_tokens + completion_tokens
-        self.cost += cost
-        self.model = model
+        with self._lock:
+            self.records.append(
+                {
+                    "model": model,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "cost": cost,
+                }
+            )
+            self.tokens += prompt_tokens + completion_tokens
+            self.cost += cost
+            self.model = model
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _thread_id(self):
+        ident = threading.get_ident()
+        with self._lock:
+            if ident not in self._threads:
+                self._threads[ident] = (len(self._threads) + 1, threading.current_thread().name)
+            return self._threads[ident][0]
+
+    def record_span(self, name, category, start, end, args=None):
+        span = {
+            "name": name,
+            "category": category,
+            "start": start - self._origin,
+            "duration": end - start,
+            "thread": self._thread_id(),
+        }
+        if args:
+            span["args"] = args
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name, category="stage", **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(name, category, start, time.perf_counter(), args)
 
     def start_timer(self, name):
-        self.timings[name] = {"start": time.time(), "elapsed": 0.0}
+        with self._lock:
+            self.timings[name] = {"start": time.perf_counter(), "elapsed": 0.0}
 
     def stop_timer(self, name):
-        timing = self.timings.get(name)
-        if timing:
-            timing["elapsed"] = time.time() - timing["start"]
-            return timing["elapsed"]
-        return 0.0
+        end = time.perf_counter()
+        with self._lock:
+            timing = self.timings.get(name)
+            if not timing:
+                return 0.0
+            timing["elapsed"] = end - timing["start"]
+        self.record_span(name, "pass", timing["start"], end)
+        return timing["elapsed"]
+
+    def histograms(self):
+        with self._lock:
+            spans = list(self.spans)
+        grouped = {}
+        for span in spans:
+            grouped.setdefault("%s:%s" % (span["category"], span["name"]), []).append(span["duration"] * 1000.0)
+        result = {}
+        for key, durations in sorted(grouped.items()):
+            durations.sort()
+            entry = {"count": len(durations), "total_ms": round(sum(durations), 3), "max_ms": round(durations[-1], 3)}
+            for rank in PERCENTILES:
+                entry["p%d_ms" % rank] = round(percentile(durations, rank), 3)
+            result[key] = entry
+        return result
+
+    def chrome_trace(self):
+        with self._lock:
+            spans = list(self.spans)
+            threads = list(self._threads.values())
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in threads
+        ]
+        for span in spans:
+            event = {
+                "name": span["name"],
+                "cat": span["category"],
+                "ph": "X",
+                "ts": round(span["start"] * 1e6, 3),
+                "dur": round(span["duration"] * 1e6, 3),
+                "pid": 1,
+                "tid": span["thread"],
+            }
+            if "args" in span:
+                event["args"] = span["args"]
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path):
+        destination = Path(path)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
 
     def summary(self):
+        with self._lock:
+            timings = dict(self.timings)
         return {
             "model": self.model,
             "tokens": self.tokens,
             "cost_usd": round(self.cost, 6),
-            "timings": {key: value.get("elapsed", 0.0) for key, value in self.timings.items()},
+            "timings": {key: value.get("elapsed", 0.0) for key, value in timings.items()},
+            "latency": self.histograms(),
+            "cache": {
+                "hits": self.counters.get("cache_hits", 0),
+                "misses": self.counters.get("cache_misses", 0),
+            },
+            "triage": {
+                "sent": self.counters.get("triage_sent", 0),
+                "skipped": self.counters.get("triage_skipped", 0),
+            },
+            "llm": {
+                "errors": self.counters.get("llm_errors", 0),
+                "transient": self.counters.get("llm_errors_transient", 0),
+                "rate_limited": self.counters.get("llm_errors_rate_limited", 0),
+                "permanent": self.counters.get("llm_errors_permanent", 0),
+                "retries": self.counters.get("llm_retries", 0),
+                "retry_sleep_s": self.counters.get("llm_retry_sleep_ms", 0) / 1000.0,
+                "deadline_exceeded": self.counters.get("llm_deadline_exceeded", 0),
+                "circuit_opened": self.counters.get("llm_circuit_opened", 0),
+            },
+            "fused": {
+                "calls_saved": self.counters.get("fused_calls_saved", 0),
+                "tokens_saved": self.counters.get("fused_tokens_saved", 0),
+            },
         }
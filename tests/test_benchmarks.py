@@ -0,0 +1,24 @@
+from benchmarks.corpus import generate_project
+from benchmarks.run import compare
+from pfread.preprocess import resolve_document
+
+
+def test_corpus_generator_is_deterministic_and_nested(tmp_path):
+    first = generate_project(tmp_path / "a", files=6, size_bytes=20 * 1024, depth=3, seed=7)
+    second = generate_project(tmp_path / "b", files=6, size_bytes=20 * 1024, depth=3, seed=7)
+    assert [path.read_bytes() for path in first["files"]] == [path.read_bytes() for path in second["files"]]
+    assert first["bytes"] >= 20 * 1024
+    order = resolve_document(first["main"])
+    assert len(order) == 7
+    assert {path.relative_to(tmp_path / "a").parts[1] for path in order[1:]} == {"level0", "level1", "level2"}
+    text = "".join(path.read_text(encoding="utf-8") for path in first["files"])
+    assert "\\ref{" in text and "\\cite{" in text and "$" in text
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"stages": {"fast": {"seconds": 1.0}, "tiny": {"seconds": 0.001}}}
+    results = {"stages": {"fast": {"seconds": 1.5}, "tiny": {"seconds": 0.003}, "new": {"seconds": 2.0}}}
+    rows = {row["stage"]: row for row in compare(results, baseline, tolerance=0.25, min_delta=0.005)}
+    assert not rows["fast"]["ok"]
+    assert rows["tiny"]["ok"]
+    assert rows["new"]["ok"] and rows["new"]["baseline"] is None
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from pfread.llm import LLMClient
+from pfread.main import run_cli
+from pfread.utils.cache import ResponseCache
+from pfread.utils.telemetry import Telemetry
+
+
+def test_cached_response_skips_second_call(tmp_path):
+    telemetry = Telemetry()
+    cache = ResponseCache(tmp_path / "cache")
+    llm = LLMClient(fake=True, telemetry=telemetry, cache=cache)
+    user = json.dumps({"task": "proofread_sentence", "sentence": "This is teh sentence."})
+    first = llm.complete_json("system", user, max_tokens=64)
+    second = llm.complete_json("system", user, max_tokens=64)
+    assert first == second
+    assert len(telemetry.records) == 1
+    summary = telemetry.summary()
+    assert summary["cache"] == {"hits": 1, "misses": 1}
+    llm.complete_json("system", user, max_tokens=128)
+    assert telemetry.summary()["cache"]["misses"] == 2
+    cache.close()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path / "cache", max_bytes=40)
+    cache.put("old", {"value": "a" * 10})
+    cache.put("new", {"value": "b" * 10})
+    cache.get("old")
+    cache.put("newest", {"value": "c" * 10})
+    cache.prune()
+    assert cache.get("new") is None
+    assert cache.get("newest") == {"value": "c" * 10}
+    cache.close()
+
+
+def test_cache_keys_separate_fake_and_endpoint_backends(tmp_path):
+    cache = ResponseCache(tmp_path / "cache")
+    user = json.dumps({"task": "proofread_sentence", "sentence": "This is teh sentence."})
+    LLMClient(fake=True, cache=cache).complete_json("system", user)
+    real = LLMClient(endpoint="http://127.0.0.1:9/v1", cache=cache, max_retries=0)
+    with pytest.raises(RuntimeError):
+        real.complete_json("system", user)
+    assert real.telemetry.summary()["cache"] == {"hits": 0, "misses": 1}
+    cache.close()
+
+
+def test_fully_cached_rerun_keeps_model_and_reports_hits(tmp_path):
+    (tmp_path / "main.tex").write_text("This is teh end.\n", encoding="utf-8")
+    out_dir = tmp_path / "out"
+    argv = [
+        "--report",
+        str(out_dir / "report.html"),
+        "--json",
+        str(out_dir / "findings.json"),
+        "--project-dir",
+        str(tmp_path),
+        "--main",
+        str(tmp_path / "main.tex"),
+        "--mode",
+        "typo",
+        "--fake-llm",
+    ]
+    run_cli(argv)
+    meta = run_cli(argv)["meta"]
+    assert meta["model"] == "gpt-5-nano"
+    assert meta["tokens"] == 0
+    assert meta["cache_hits"] > 0
+    saved = json.loads((out_dir / "findings.json").read_text(encoding="utf-8"))["meta"]
+    assert saved["model"] == "gpt-5-nano" and saved["cache_hits"] == meta["cache_hits"]
@@ -1,8 +1,10 @@
 from pathlib import Path
 
-from pfread.passes.cross import run_cross_pass
+from pfread.passes import cross
+from pfread.passes.cross import location_from_index, run_cross_pass
 from pfread.preprocess import flatten_sources
-from pfread.utils.schema import IssueIdGenerator
+from pfread.utils.offsets import LineTable
+from pfread.utils.schema import stable_issue_key
 
 
 def test_cross_checks_detects_missing_reference_and_style(tmp_path):
@@ -12,9 +14,86 @@ def test_cross_checks_detects_missing_reference_and_style(tmp_path):
         encoding="utf-8",
     )
     flattened = flatten_sources([tex_path])
-    generator = IssueIdGenerator()
-    issues, label_index = run_cross_pass(flattened["files"], flattened["index"], None, generator)
+    issues, label_index = run_cross_pass(flattened["files"], flattened["index"], None)
     issue_types = {issue.type for issue in issues}
     assert "ref_error" in issue_types
     assert "style_inconsistency" in issue_types
     assert "fig:system" in label_index
+
+
+def test_line_table_matches_location_from_index():
+    text = "\nfirst line\n\nthird \\ref{x}\nlast"
+    lines = LineTable(text)
+    for position in range(len(text) + 1):
+        assert lines.location(position) == location_from_index(text, position)
+
+
+def test_registered_check_runs_in_the_same_scan(tmp_path, monkeypatch):
+    tex_path = tmp_path / "paper.tex"
+    tex_path.write_text("We TODO this later.\n", encoding="utf-8")
+    flattened = flatten_sources([tex_path])
+
+    def setup_todo_check(context, scanner):
+        issues = []
+        scanner.register(
+            r"TODO",
+            lambda match: issues.append(
+                context.issue(match.start(), 4, "todo", "minor", "TODO", "Resolve it.", "Open TODO.")
+            ),
+            first="T",
+        )
+        return lambda: issues
+
+    monkeypatch.setattr(cross, "CROSS_CHECKS", list(cross.CROSS_CHECKS))
+    cross.register_cross_check(setup_todo_check)
+    issues, _ = cross.run_cross_pass(flattened["files"], flattened["index"])
+    assert [issue.type for issue in issues] == ["acronym_inconsistent", "todo"]
+    assert [issue.id for issue in issues] == [stable_issue_key(issue) for issue in issues]
+
+
+def test_parallel_cross_pass_matches_serial(tmp_path):
+    paths = []
+    for index in range(3):
+        tex_path = tmp_path / ("chapter%d.tex" % index)
+        tex_path.write_text(
+            "\\section{Part %d}\\label{sec:%d}\nThe LSTM model (LSTM) runs 5 ms, see Fig. 1 and \\ref{sec:%d}.\n"
+            % (index, index, index + 1),
+            encoding="utf-8",
+        )
+        paths.append(tex_path)
+    bib_path = tmp_path / "refs.bib"
+    bib_path.write_text("@article{smith2020,}\n", encoding="utf-8")
+    flattened = flatten_sources(paths)
+    serial, serial_labels = run_cross_pass(flattened["files"], flattened["index"], bib_path)
+    parallel, parallel_labels = run_cross_pass(
+        flattened["files"], flattened["index"], bib_path, workers=2, parallel_min_files=1
+    )
+    assert [issue.to_dict() for issue in parallel] == [issue.to_dict() for issue in serial]
+    assert parallel_labels == serial_labels
+
+
+def test_serial_cross_pass_pushes_each_file_before_scanning_the_next(tmp_path, monkeypatch):
+    paths = []
+    for index in range(3):
+        tex_path = tmp_path / ("chapter%d.tex" % index)
+        tex_path.write_text("See Fig. 1 and \\ref{sec:%d}.\n\\label{sec:%d}\n" % (index + 1, index), encoding="utf-8")
+        paths.append(tex_path)
+    flattened = flatten_sources(paths)
+    events = []
+    scan_record = cross.scan_record
+
+    def logged_scan(context, checks):
+        events.append(("scan", Path(context.path).name))
+        return scan_record(context, checks)
+
+    class Sink:
+        def extend(self, issues):
+            events.extend(("push", Path(issue.span.file).name) for issue in issues)
+
+    monkeypatch.setattr(cross, "scan_record", logged_scan)
+    issues, _ = cross.run_cross_pass(flattened["files"], flattened["index"], sink=Sink())
+    assert issues == []
+    scanned = [name for kind, name in events if kind == "scan"]
+    assert scanned == ["chapter0.tex", "chapter1.tex", "chapter2.tex"]
+    assert events.index(("push", "chapter0.tex")) < events.index(("scan", "chapter1.tex"))
+    assert events.index(("push", "chapter1.tex")) < events.index(("scan", "chapter2.tex"))
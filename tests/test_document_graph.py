@@ -0,0 +1,30 @@
+from pfread.preprocess import resolve_document
+
+
+def test_only_reachable_files_in_document_order(tmp_path):
+    (tmp_path / "chapters").mkdir()
+    (tmp_path / "main.tex").write_text(
+        "\\includeonly{chapters/intro,chapters/method}\n"
+        "\\input{preamble}\n"
+        "% \\input{old_draft}\n"
+        "\\include{chapters/method}\n"
+        "\\include{chapters/intro}\n"
+        "\\include{chapters/appendix}\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "preamble.tex").write_text("\\usepackage{amsmath}\n", encoding="utf-8")
+    (tmp_path / "chapters" / "method.tex").write_text("\\input{chapters/figure}\n", encoding="utf-8")
+    (tmp_path / "chapters" / "figure.tex").write_text("A figure.\n", encoding="utf-8")
+    (tmp_path / "chapters" / "intro.tex").write_text("\\input{chapters/method}\n", encoding="utf-8")
+    (tmp_path / "chapters" / "appendix.tex").write_text("Excluded.\n", encoding="utf-8")
+    (tmp_path / "old_draft.tex").write_text("Stale.\n", encoding="utf-8")
+    cache_path = tmp_path / "cache" / "graph.json"
+
+    order = resolve_document(tmp_path / "main.tex", cache_path)
+    names = [path.relative_to(tmp_path).as_posix() for path in order]
+    assert names == ["main.tex", "preamble.tex", "chapters/method.tex", "chapters/figure.tex", "chapters/intro.tex"]
+    assert resolve_document(tmp_path / "main.tex", cache_path) == order
+
+    (tmp_path / "chapters" / "intro.tex").write_text("\\input{old_draft}\n", encoding="utf-8")
+    order = resolve_document(tmp_path / "main.tex", cache_path)
+    assert order[-1].name == "old_draft.tex"
@@ -0,0 +1,82 @@
+import json
+
+from pfread.main import run_cli
+from pfread.utils.findings import FindingsSink, IssueSpool, iter_findings, write_findings_json
+from pfread.utils.schema import Issue, Span, assign_stable_ids, findings_json
+
+
+def make_issue(phase, excerpt, start, evidence=None):
+    return Issue(
+        id="",
+        phase=phase,
+        type="style",
+        severity="minor",
+        span=Span(file="paper.tex", start=start, end=start + 4, line=1),
+        excerpt=excerpt,
+        suggestion="Café “quoted”",
+        explanation='line\nbreak "and" \\ slash',
+        autofix="manual",
+        evidence=evidence or {},
+    )
+
+
+def test_streamed_findings_match_legacy_layout(tmp_path):
+    meta = {"run_id": "pfread-1", "cost_usd": 0.25}
+    files = [{"path": "paper.tex", "sha": "abc"}]
+    review = {"summary": "Fine.", "strengths": [], "top_fixes": [{"section": "Intro", "impact": "high"}]}
+    sink = FindingsSink(tmp_path / "findings.jsonl", ("typo", "cross"))
+    sink.spool("cross").extend([make_issue("cross", "dup", 9, {"score": 0.5, "keys": ["a"]})])
+    sink.spool("typo").push(make_issue("typo", "dup", 3))
+    sink.spool("typo").push(make_issue("typo", "dup", 1))
+    assert sink.close() == 3
+    assert not list(tmp_path.glob("*.spool"))
+
+    expected_issues = assign_stable_ids(
+        [
+            make_issue("typo", "dup", 3),
+            make_issue("typo", "dup", 1),
+            make_issue("cross", "dup", 9, {"score": 0.5, "keys": ["a"]}),
+        ]
+    )
+    assert list(iter_findings(sink.path)) == [issue.to_dict() for issue in expected_issues]
+    write_findings_json(tmp_path / "findings.json", meta, files, iter_findings(sink.path), review)
+    legacy = findings_json(meta, files, expected_issues, review)
+    assert (tmp_path / "findings.json").read_text(encoding="utf-8") == legacy
+
+    write_findings_json(tmp_path / "empty.json", meta, files, iter([]), review)
+    assert (tmp_path / "empty.json").read_text(encoding="utf-8") == findings_json(meta, files, [], review)
+    assert json.loads((tmp_path / "empty.json").read_text(encoding="utf-8"))["issues"] == []
+
+
+def test_cli_passes_stream_into_spools(tmp_path, monkeypatch):
+    pushed = []
+    original = IssueSpool.push
+
+    def push(self, issue):
+        pushed.append(issue.phase)
+        original(self, issue)
+
+    monkeypatch.setattr(IssueSpool, "push", push)
+    project = tmp_path / "paper"
+    project.mkdir()
+    (project / "main.tex").write_text(
+        "\\section{Intro}\nThe the model recieve inputs. See Figure~\\ref{fig:missing}.\n", encoding="utf-8"
+    )
+    out = tmp_path / "out"
+    result = run_cli(
+        [
+            "--report",
+            str(out / "report.html"),
+            "--json",
+            str(out / "findings.json"),
+            "--project-dir",
+            str(project),
+            "--main",
+            str(project / "main.tex"),
+            "--fake-llm",
+            "--no-cache",
+        ]
+    )
+    assert len(result["issues"]) == result["issue_count"] == len(pushed)
+    assert sorted(issue.phase for issue in result["issues"]) == sorted(pushed)
+    assert "cross" in pushed
@@ -0,0 +1,90 @@
+import os
+import random
+import sys
+
+import pytest
+
+from pfread.preprocess import FlattenCache, flatten_sources
+from pfread.preprocess.latex_flatten import clean_line, clean_lines
+
+
+def test_streaming_lexer_matches_clean_line_on_single_lines():
+    rng = random.Random(3)
+    alphabet = list("ab {}[]\\%@ x") + ["\\textbf", "\\begin", "\\end", "\\emph", "\\item", "\\[", "\\]", "\\%"]
+    lines = [
+        "Plain \\textbf{bold \\emph{nested}} text % comment",
+        "\\begin{figure}[t]\\caption{Overview \\cite[p.~3]{key}}",
+        "\\item[{a]}b] 50\\% of \\{braces\\} \\\\ end",
+        "\\textbf{\\item[x}y]} tail",
+    ]
+    lines.extend("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))) for _ in range(5000))
+    for line in lines:
+        assert next(clean_lines([line])) == clean_line(line)
+
+
+def test_arguments_may_span_lines(tmp_path):
+    tex_path = tmp_path / "paper.tex"
+    tex_path.write_text("\\textbf{first\nsecond} after\n\\begin{figure\n}text\n", encoding="utf-8")
+    flattened = flatten_sources([tex_path])
+    assert flattened["text"] == "first\nsecond after\n\ntext\n\n"
+    index = flattened["index"]
+    assert (index.line_at(6), index.entries[6].column) == (2, 0)
+
+
+def test_unclosed_optional_argument_ends_at_line_end(tmp_path):
+    tex_path = tmp_path / "paper.tex"
+    tex_path.write_text(
+        "We sample $x \\in \\left[0, 1\\right)$ uniformly.\nThen we proceed.\nAnd finish.\n\nNext paragraph.\n",
+        encoding="utf-8",
+    )
+    text = flatten_sources([tex_path])["text"]
+    assert text.splitlines()[0] == clean_line("We sample $x \\in \\left[0, 1\\right)$ uniformly.")[0]
+    assert "Then we proceed.\nAnd finish.\n\nNext paragraph." in text
+
+
+def index_state(index):
+    return (
+        index.files,
+        index._lines.tolist(),
+        index._columns.tolist(),
+        index._file_run_starts,
+        index._line_runs,
+        index._unsorted_lines,
+    )
+
+
+def test_flatten_cache_round_trip_and_eviction(tmp_path):
+    first = tmp_path / "a.tex"
+    second = tmp_path / "b.tex"
+    first.write_text("Intro \\textbf{bold}\n\n% note\nCaf\u00e9 \\emph{x\ny} end\n", encoding="utf-8")
+    second.write_text("\\section{Two}\nMore text.", encoding="utf-8")
+    expected = flatten_sources([first, second])
+    cache = FlattenCache(tmp_path / "cache")
+    cold = flatten_sources([first, second], cache)
+    warm = flatten_sources([first, second], cache)
+    assert (cache.hits, cache.misses) == (2, 2)
+    for flattened in (cold, warm):
+        assert flattened["text"] == expected["text"]
+        assert index_state(flattened["index"]) == index_state(expected["index"])
+    stale = cache.path_for(cold["files"][0]["sha"])
+    fresh = cache.path_for(cold["files"][1]["sha"])
+    os.utime(stale, (0, 0))
+    cache.max_bytes = fresh.stat().st_size
+    cache.close()
+    assert list((tmp_path / "cache").glob("*.bin")) == [fresh]
+
+
+def test_flatten_cache_decodes_from_the_mapped_segment(tmp_path):
+    tex_path = tmp_path / "a.tex"
+    tex_path.write_text("Intro \\textbf{bold}\nCaf\u00e9 end\n", encoding="utf-8")
+    cache = FlattenCache(tmp_path / "cache")
+    sha = flatten_sources([tex_path], cache)["files"][0]["sha"]
+    seen = []
+    assert cache.get(sha, lambda segment: seen.append(segment) or True)
+    if sys.byteorder == "little":
+        columns = seen[0]["columns"]
+        assert isinstance(columns, memoryview)
+        with pytest.raises(ValueError):
+            len(columns)
+    copied = cache.get(sha)
+    assert copied["columns"].typecode == "I" and copied["text"] == "Intro bold\nCaf\u00e9 end\n\n"
@@ -0,0 +1,43 @@
+import pytest
+
+from pfread.llm import LLMClient
+from pfread.main import run_cli
+from pfread.passes import run_fused_pass, run_paragraph_pass, run_sentences_pass
+from pfread.preprocess import flatten_sources
+
+
+class MalformedFusedClient(LLMClient):
+    def _fake_fused(self, data):
+        return {"sentences": [], "diagnostics": "invalid"}
+
+
+def test_fused_pass_matches_separate_passes(tmp_path):
+    tex_path = tmp_path / "paper.tex"
+    tex_path.write_text(
+        "This is teh intro. It maybe works.\n\nWe use alot of data. The results are very very good.\n\nDone.\n",
+        encoding="utf-8",
+    )
+    flattened = flatten_sources([tex_path])
+    text, index = flattened["text"], flattened["index"]
+    separate = LLMClient(fake=True)
+    typo_expected, _, diff_expected = run_sentences_pass(text, index, separate)
+    paragraph_expected = run_paragraph_pass(text, index, separate)
+    expected = [issue.to_dict() for issue in typo_expected + paragraph_expected]
+
+    for client in (LLMClient(fake=True), MalformedFusedClient(fake=True)):
+        typo_issues, paragraph_issues, _, diff_text = run_fused_pass(text, index, client)
+        assert [issue.to_dict() for issue in typo_issues + paragraph_issues] == expected
+        assert diff_text == diff_expected
+
+    fused = LLMClient(fake=True)
+    run_fused_pass(text, index, fused)
+    assert len(fused.telemetry.records) == 3
+    summary = fused.telemetry.summary()["fused"]
+    assert summary["calls_saved"] == len(separate.telemetry.records) - 3
+    assert summary["tokens_saved"] > 0
+
+
+def test_fuse_rejects_packing_options(tmp_path):
+    argv = ["--report", str(tmp_path / "report.html"), "--json", str(tmp_path / "findings.json"), "--fake-llm"]
+    with pytest.raises(SystemExit):
+        run_cli(argv + ["--fuse", "--batch-tokens", "200"])
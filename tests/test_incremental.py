@@ -0,0 +1,57 @@
+import json
+
+from pfread.main import run_cli
+from pfread.utils.incremental import UnitState, load_state, save_state
+
+
+def run(project_dir, out_dir, *extra):
+    argv = [
+        "--mode",
+        "typo,paragraph",
+        "--report",
+        str(out_dir / "report.html"),
+        "--json",
+        str(out_dir / "findings.json"),
+        "--project-dir",
+        str(project_dir),
+        "--fake-llm",
+        "--no-cache",
+        *extra,
+    ]
+    result = run_cli(argv)
+    metadata = json.loads((out_dir / "metadata.json").read_text(encoding="utf-8"))
+    issues = [json.loads(line) for line in result["findings"].read_text(encoding="utf-8").splitlines()]
+    return issues, metadata["incremental"]
+
+
+def test_incremental_rechecks_only_changed_units(tmp_path):
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    tex_path = project_dir / "main.tex"
+    tex_path.write_text(
+        "This is teh first sentence. A second one.\n\nAnother paragraph here.\n\nThe last paragraph.\n",
+        encoding="utf-8",
+    )
+    _, first = run(project_dir, tmp_path / "out", "--incremental")
+    assert first == {"enabled": True, "reused": 0, "checked": 7, "discarded": None}
+    assert (tmp_path / "out" / "findings.state.json").exists()
+
+    tex_path.write_text(
+        "Intro added. This is teh first sentence. A second one.\n\nAnother paragraph here.\n\nThe last paragraph.\n",
+        encoding="utf-8",
+    )
+    issues, second = run(project_dir, tmp_path / "out", "--incremental")
+    assert second == {"enabled": True, "reused": 6, "checked": 2, "discarded": None}
+    expected, _ = run(project_dir, tmp_path / "full")
+    assert issues == expected
+
+
+def test_state_from_another_backend_or_prompt_is_discarded(tmp_path):
+    path = tmp_path / "findings.state.json"
+    state = UnitState("gpt-5-nano", backend="fake", prompts="abc")
+    state.record("sentence", "A sentence.", {"status": "ok"})
+    save_state(path, state)
+    assert load_state(path, "gpt-5-nano", "fake", "abc").lookup("sentence", "A sentence.") == {"status": "ok"}
+    real = load_state(path, "gpt-5-nano", "endpoint:http://127.0.0.1:8000/v1", "abc")
+    assert real.discarded == "backend" and real.lookup("sentence", "A sentence.") is None
+    assert load_state(path, "gpt-5-nano", "fake", "def").discarded == "prompts"
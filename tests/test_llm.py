@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+
+from pfread.llm import LLMClient
+from pfread.main import run_cli
+
+
+def test_complete_json_many_keeps_order_and_overlaps_calls():
+    sentences = ["Sentence %d has teh typo." % index for index in range(8)]
+    users = [json.dumps({"task": "proofread_sentence", "sentence": sentence}) for sentence in sentences]
+    llm = LLMClient(fake=True, concurrency=8, fake_latency=0.05)
+    started = time.perf_counter()
+    responses = llm.complete_json_many("system", users, max_tokens=64)
+    elapsed = time.perf_counter() - started
+    assert [response["original"] for response in responses] == sentences
+    assert elapsed < 0.05 * len(users) / 2
+
+
+class CountingClient(LLMClient):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def fake_answer(self, user):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        return {"status": "ok"}
+
+
+def test_concurrency_limit_is_shared_across_concurrent_batches():
+    llm = CountingClient(fake=True, concurrency=3)
+    users = [json.dumps({"task": "proofread_sentence", "sentence": "S%d." % index}) for index in range(12)]
+    threads = [threading.Thread(target=llm.complete_json_many, args=("system", users)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert llm.peak == 3
+
+
+def test_fake_latency_bypasses_response_cache(tmp_path):
+    (tmp_path / "main.tex").write_text("This is teh end.\n", encoding="utf-8")
+    out_dir = tmp_path / "out"
+    argv = [
+        "--report",
+        str(out_dir / "report.html"),
+        "--json",
+        str(out_dir / "findings.json"),
+        "--project-dir",
+        str(tmp_path),
+        "--main",
+        str(tmp_path / "main.tex"),
+        "--mode",
+        "typo",
+        "--fake-llm",
+        "--fake-latency",
+        "0.001",
+    ]
+    for _ in range(2):
+        run_cli(argv)
+    metadata = json.loads((out_dir / "metadata.json").read_text(encoding="utf-8"))
+    assert metadata["cache"] == {"hits": 0, "misses": 0}
+    assert metadata["tokens"] > 0
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from pfread.llm import LLMClient, LLMRequestError
+from pfread.llm_sim import LLMSimulator, parse_profile, start_server
+from pfread.main import run_cli
+
+
+def sentence(text):
+    return json.dumps({"task": "proofread_sentence", "sentence": text})
+
+
+def plans(profile, users):
+    simulator = LLMSimulator(parse_profile(profile), sleep=lambda seconds: None)
+    return [simulator.plan(user, 10, 10) for user in users]
+
+
+def test_simulation_is_deterministic_per_seed():
+    users = [sentence("Sentence %d." % index) for index in range(50)] * 2
+    profile = "latency=lognormal:0.2:0.5,errors=0.1,rate_limits=0.1,timeouts=0.05"
+    first = plans(profile + ",seed=3", users)
+    assert first == plans(profile + ",seed=3", list(users))
+    assert first != plans(profile + ",seed=4", users)
+    assert first[:50] != first[50:]
+    assert {plan["outcome"] for plan in first} == {"ok", "error", "rate_limited", "timeout"}
+    with pytest.raises(ValueError):
+        parse_profile("latency=gamma:1")
+
+
+def test_token_quota_rate_limits_until_window_frees():
+    now = [0.0]
+    simulator = LLMSimulator(parse_profile("tpm=30"), sleep=lambda seconds: None, clock=lambda: now[0])
+    assert simulator.plan(sentence("a"), 10, 10)["outcome"] == "ok"
+    now[0] = 20.0
+    limited = simulator.plan(sentence("b"), 10, 10)
+    assert limited["outcome"] == "rate_limited" and limited["retry_after"] == 40.0
+    now[0] = 60.0
+    assert simulator.plan(sentence("b"), 10, 10)["outcome"] == "ok"
+
+
+def test_in_process_errors_go_through_retry_loop():
+    simulator = LLMSimulator(parse_profile("errors=1"), sleep=lambda seconds: None)
+    llm = LLMClient(fake=True, simulator=simulator, max_retries=1)
+    with pytest.raises(RuntimeError, match="Simulated server error"):
+        llm.complete_json("system", sentence("Fine."))
+    assert llm.telemetry.counters["llm_errors"] == 2
+
+
+def test_http_stand_in_serves_real_client_path():
+    server = start_server(parse_profile("tps=1000"))
+    try:
+        endpoint = "http://127.0.0.1:%d/v1" % server.server_port
+        llm = LLMClient(endpoint=endpoint, api_key="")
+        user = sentence("This is teh end.")
+        assert llm.complete_json("system", user) == LLMClient(fake=True).complete_json("system", user)
+        assert llm.telemetry.tokens > 0
+        server.simulator.profile = parse_profile("rate_limits=1,retry_after=2.5")
+        with pytest.raises(LLMRequestError) as caught:
+            llm._http_response("system", user, "gpt-5-nano", 0.0, 64)
+        assert caught.value.status == 429 and caught.value.retry_after == 2.5
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_cli_simulate_requires_fake_llm_and_skips_cache(tmp_path):
+    (tmp_path / "main.tex").write_text("This is teh end.\n", encoding="utf-8")
+    out_dir = tmp_path / "out"
+    argv = [
+        "--report",
+        str(out_dir / "report.html"),
+        "--json",
+        str(out_dir / "findings.json"),
+        "--project-dir",
+        str(tmp_path),
+        "--main",
+        str(tmp_path / "main.tex"),
+        "--mode",
+        "typo",
+        "--simulate",
+        "seed=1",
+    ]
+    with pytest.raises(SystemExit):
+        run_cli(argv)
+    for _ in range(2):
+        run_cli(argv + ["--fake-llm"])
+    metadata = json.loads((out_dir / "metadata.json").read_text(encoding="utf-8"))
+    assert metadata["cache"] == {"hits": 0, "misses": 0}
+    assert not (out_dir / ".pfread_cache" / "responses.sqlite3").exists()
@@ -0,0 +1,42 @@
+import random
+
+from pfread.utils.offsets import OffsetIndex
+
+
+def linear_find(index, file_path, line, column, exact):
+    for idx, entry in enumerate(index.entries):
+        if entry.file == file_path and entry.line == line:
+            if entry.column == column or (not exact and entry.column > column):
+                return idx
+    return None
+
+
+def test_lookups_match_linear_scan():
+    rng = random.Random(7)
+    index = OffsetIndex()
+    for file_path in ("a.tex", "b.tex"):
+        for line in range(1, 30):
+            columns = sorted(rng.sample(range(60), rng.randint(0, 20)))
+            index.extend_from_mapping(file_path, line, columns)
+            index.add_newline(file_path, line, 60)
+    index.extend_from_mapping("a.tex", 3, [50, 10, 70])
+    for _ in range(500):
+        file_path = rng.choice(("a.tex", "b.tex", "c.tex"))
+        line = rng.randint(0, 31)
+        column = rng.randint(0, 75)
+        assert index._find_position(file_path, line, column) == linear_find(index, file_path, line, column, False)
+        assert index.global_from_local(file_path, line, column) == linear_find(index, file_path, line, column, True)
+
+
+def test_columnar_index_keeps_entry_access():
+    index = OffsetIndex()
+    index.extend_from_mapping("a.tex", 1, [0, 1, 2])
+    index.add_newline("a.tex", 1, 3)
+    index.extend_from_mapping("b.tex", 4, [2, 5])
+    assert len(index.entries) == 6
+    assert index.entries[0].file == "a.tex"
+    assert index.entries[-1] == index.entries[5]
+    assert [entry.column for entry in index.entries[3:]] == [3, 2, 5]
+    assert index.file_at(4) == "b.tex" and index.line_at(4) == 4
+    assert index.span_for(1, 5) == {"file": "a.tex", "start": 1, "end": 5, "line": 1, "end_line": 4}
+    assert index.memory_footprint() > 0
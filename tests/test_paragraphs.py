@@ -1,8 +1,23 @@
 from pfread.llm import LLMClient
-from pfread.passes.paragraphs import run_paragraph_pass
+from pfread.passes.paragraphs import PACK_SEPARATOR, PARAGRAPH_MAX_TOKENS, run_paragraph_pass
 from pfread.preprocess import flatten_sources
 
 
+class TruncatingPackedClient(LLMClient):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.budgets = []
+
+    def _fake_response(self, system, user, model, temperature, max_tokens):
+        self.budgets.append(max_tokens)
+        return super()._fake_response(system, user, model, temperature, max_tokens)
+
+    def _fake_paragraph(self, data):
+        if PACK_SEPARATOR in data.get("paragraph", ""):
+            raise ValueError("Model returned non-JSON content")
+        return super()._fake_paragraph(data)
+
+
 def test_paragraph_pass_detects_multiple_issues(tmp_path):
     tex_path = tmp_path / "paper.tex"
     tex_path.write_text(
@@ -15,3 +30,39 @@ def test_paragraph_pass_detects_multiple_issues(tmp_path):
     kinds = {issue.type for issue in issues}
     assert "hedging" in kinds
     assert "long_sentence" in kinds
+
+
+def test_packing_merges_short_paragraphs_and_maps_spans_back(tmp_path):
+    tex_path = tmp_path / "paper.tex"
+    long_sentence = " ".join("word%d" % index for index in range(30))
+    tex_path.write_text(
+        "Short one.\n\n\\item A list item.\n\nCaption that maybe helps.\n\n"
+        "Opening line. %s. Closing line is very very short.\n" % long_sentence,
+        encoding="utf-8",
+    )
+    flattened = flatten_sources([tex_path])
+    expected = run_paragraph_pass(flattened["text"], flattened["index"], LLMClient(fake=True))
+    llm = LLMClient(fake=True)
+    issues = run_paragraph_pass(flattened["text"], flattened["index"], llm, token_budget=32)
+    assert len(llm.telemetry.records) == 3
+    key = lambda issue: (issue.type, issue.span.start)
+    assert [issue.to_dict() for issue in sorted(issues, key=key)] == [
+        issue.to_dict() for issue in sorted(expected, key=key)
+    ]
+    for issue in issues:
+        assert flattened["text"][issue.span.start:issue.span.end] == issue.excerpt
+
+
+def test_failed_packed_chunk_falls_back_to_single_paragraphs(tmp_path):
+    tex_path = tmp_path / "paper.tex"
+    tex_path.write_text(
+        "Short one.\n\nIt maybe works.\n\nCaption that perhaps helps.\n\nDone.\n", encoding="utf-8"
+    )
+    flattened = flatten_sources([tex_path])
+    expected = run_paragraph_pass(flattened["text"], flattened["index"], LLMClient(fake=True))
+    llm = TruncatingPackedClient(fake=True)
+    issues = run_paragraph_pass(flattened["text"], flattened["index"], llm, token_budget=200)
+    assert [issue.to_dict() for issue in issues] == [issue.to_dict() for issue in expected]
+    assert llm.budgets[0] == PARAGRAPH_MAX_TOKENS * 4
+    assert llm.budgets[1:] == [PARAGRAPH_MAX_TOKENS] * 4
+    assert llm.telemetry.summary()["llm"]["permanent"] == 1
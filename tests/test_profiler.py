@@ -0,0 +1,56 @@
+import json
+
+from pfread.main import run_cli
+from pfread.utils.profiler import StageProfiler
+
+
+def busy_loop():
+    total = 0
+    for value in range(400000):
+        total += value * value
+    return total
+
+
+def test_stage_profiler_ranks_hot_functions_and_peak_memory():
+    profiler = StageProfiler(interval=0.001)
+    profiler.start()
+    try:
+        with profiler.stage("compute"):
+            busy_loop()
+        with profiler.stage("allocate"):
+            block = [bytearray(1024) for _ in range(2000)]
+            del block
+    finally:
+        profiler.stop()
+    report = profiler.report()
+    compute, allocate = report["stages"]
+    assert compute["name"] == "compute" and compute["samples"] > 0
+    assert compute["hot_functions"][0]["function"] == "busy_loop"
+    assert allocate["memory"]["peak_growth_bytes"] >= 2000 * 1024
+    assert allocate["memory"]["end_bytes"] < allocate["memory"]["peak_bytes"]
+
+
+def test_cli_profile_writes_sidecar_and_summary(tmp_path):
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    (project_dir / "main.tex").write_text("This is teh first sentence.\n\nAnother paragraph.\n", encoding="utf-8")
+    out_dir = tmp_path / "out"
+    run_cli(
+        [
+            "--report",
+            str(out_dir / "report.html"),
+            "--json",
+            str(out_dir / "findings.json"),
+            "--project-dir",
+            str(project_dir),
+            "--fake-llm",
+            "--no-cache",
+            "--profile",
+        ]
+    )
+    profile = json.loads((out_dir / "profile.json").read_text(encoding="utf-8"))
+    metadata = json.loads((out_dir / "metadata.json").read_text(encoding="utf-8"))
+    names = [stage["name"] for stage in profile["stages"]]
+    assert names[0] == "flatten" and names[-1] == "write_report"
+    assert {"typo", "cross", "paragraph", "review", "write_jsonl"} <= set(names)
+    assert set(metadata["profile"]["stages"]) == set(names)
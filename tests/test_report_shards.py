@@ -0,0 +1,40 @@
+import json
+
+from pfread.utils import report_shards
+
+
+def parse_call(text, name):
+    prefix = "PFREAD.%s(" % name
+    assert text.startswith(prefix) and text.endswith(");\n")
+    return text[len(prefix):-3]
+
+
+def test_shards_split_by_file_phase_and_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_shards, "SHARD_SIZE", 2)
+    monkeypatch.setattr(report_shards, "MAX_OPEN_SHARDS", 1)
+    issues = [
+        {"id": "ISS-%d" % index, "phase": phase, "type": "style", "severity": "minor", "span": {"file": file}}
+        for index, (file, phase) in enumerate(
+            [("a.tex", "typo"), ("b.tex", "typo"), ("a.tex", "typo"), ("a.tex", "cross"), ("a.tex", "typo")]
+        )
+    ]
+    (tmp_path / "findings").mkdir()
+    (tmp_path / "findings" / "shard-stale.js").write_text("old", encoding="utf-8")
+    report_shards.write_report_shards(tmp_path, {"run_id": "r"}, [], iter(issues), {"summary": ""})
+    index = json.loads(parse_call((tmp_path / "findings" / "index.js").read_text(encoding="utf-8"), "registerIndex"))
+    assert index["totals"]["issues"] == 5
+    assert index["totals"]["file"] == {"a.tex": 4, "b.tex": 1}
+    assert [(shard["file"], shard["phase"], shard["part"], shard["count"]) for shard in index["shards"]] == [
+        ("a.tex", "typo", 1, 2),
+        ("b.tex", "typo", 1, 1),
+        ("a.tex", "cross", 1, 1),
+        ("a.tex", "typo", 2, 1),
+    ]
+    loaded = []
+    for shard in index["shards"]:
+        text = (tmp_path / shard["script"]).read_text(encoding="utf-8")
+        shard_id, _, body = parse_call(text, "registerShard").partition(", ")
+        assert json.loads(shard_id) == shard["id"]
+        loaded.extend(json.loads(body.replace(",\n]", "\n]")))
+    assert sorted(loaded, key=lambda issue: issue["id"]) == issues
+    assert not (tmp_path / "findings" / "shard-stale.js").exists()
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from pfread.llm import LLMClient, LLMRequestError
+from pfread.llm_sim import LLMSimulator, parse_profile
+from pfread.utils.retry import (
+    PERMANENT,
+    RATE_LIMITED,
+    TRANSIENT,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    RetryPolicy,
+    classify_error,
+)
+
+USER = json.dumps({"task": "proofread_sentence", "sentence": "Fine."})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def client(profile, clock, **retry):
+    simulator = LLMSimulator(parse_profile(profile), sleep=lambda seconds: None, clock=clock)
+    breaker = retry.pop("breaker", None) or CircuitBreaker(clock=clock)
+    policy = RetryPolicy(seed=1, sleep=clock.sleep, clock=clock, breaker=breaker, **retry)
+    return LLMClient(fake=True, simulator=simulator, retry=policy)
+
+
+def test_classify_error():
+    assert classify_error(LLMRequestError("x", status=429)) == RATE_LIMITED
+    assert classify_error(LLMRequestError("x", status=503)) == TRANSIENT
+    assert classify_error(LLMRequestError("x", status=400)) == PERMANENT
+    assert classify_error(TimeoutError()) == TRANSIENT
+    assert classify_error(ValueError("schema mismatch")) == PERMANENT
+    assert classify_error(RuntimeError("Real LLM mode is not configured")) == PERMANENT
+    assert classify_error(CircuitOpenError("open", retry_after=3.0)) == TRANSIENT
+
+
+def test_permanent_errors_fail_without_sleeping():
+    clock = FakeClock()
+    llm = LLMClient(retry=RetryPolicy(sleep=clock.sleep, clock=clock))
+    with pytest.raises(RuntimeError, match="not configured"):
+        llm.complete_json("system", USER)
+    assert clock.sleeps == []
+    assert llm.telemetry.summary()["llm"]["permanent"] == 1
+
+
+def test_rate_limits_honor_retry_after_and_backoff_is_jittered():
+    clock = FakeClock()
+    llm = client("rate_limits=1,retry_after=2", clock, max_retries=2)
+    with pytest.raises(RuntimeError, match="rate limit"):
+        llm.complete_json("system", USER)
+    assert len(clock.sleeps) == 2 and all(2.0 <= value < 2.05 for value in clock.sleeps)
+
+    clock = FakeClock()
+    llm = client("errors=1", clock, max_retries=4)
+    with pytest.raises(RuntimeError):
+        llm.complete_json("system", USER)
+    assert all(0.0 <= value <= 0.05 * 2 ** attempt for attempt, value in enumerate(clock.sleeps))
+    assert llm.telemetry.summary()["llm"]["retries"] == 4
+
+
+def test_deadline_stops_retrying_before_wasted_sleep():
+    clock = FakeClock()
+    llm = client("rate_limits=1,retry_after=5", clock, max_retries=5, call_deadline=3.0)
+    with pytest.raises(DeadlineExceeded):
+        llm.complete_json("system", USER)
+    assert clock.sleeps == []
+    clock = FakeClock()
+    llm = client("", clock, run_deadline=1.0)
+    clock.now = 2.0
+    with pytest.raises(DeadlineExceeded):
+        llm.complete_json("system", USER)
+
+
+def test_circuit_breaker_fails_fast_and_probes_after_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=2, cooldown=10.0, clock=clock)
+    llm = client("errors=1", clock, max_retries=0, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="server error"):
+            llm.complete_json("system", USER)
+    with pytest.raises(CircuitOpenError):
+        llm.complete_json("system", USER)
+    assert llm.telemetry.summary()["llm"]["circuit_opened"] == 1
+    clock.now += 10.0
+    llm.simulator.profile = parse_profile("")
+    assert llm.complete_json("system", USER) == {"status": "ok"}
+    assert breaker.state == "closed"
+
+
+def test_open_circuit_waits_out_cooldown_within_deadline():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=1, cooldown=10.0, clock=clock)
+    llm = client("errors=1", clock, max_retries=0, breaker=breaker)
+    with pytest.raises(RuntimeError, match="server error"):
+        llm.complete_json("system", USER)
+    llm.simulator.profile = parse_profile("")
+    llm.retry.max_retries = 2
+    llm.retry.call_deadline = 60.0
+    assert llm.complete_json("system", USER) == {"status": "ok"}
+    assert len(clock.sleeps) == 1 and 10.0 <= clock.sleeps[0] < 10.05
+    summary = llm.telemetry.summary()["llm"]
+    assert summary["errors"] == 2 and summary["transient"] == 2 and summary["circuit_opened"] == 1
+    assert breaker.state == "closed"
+
+    clock.now += 1.0
+    breaker.record_failure()
+    llm.retry.call_deadline = 5.0
+    with pytest.raises(DeadlineExceeded):
+        llm.complete_json("system", USER)
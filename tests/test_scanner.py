@@ -0,0 +1,21 @@
+import re
+
+from pfread.utils.scanner import MultiPatternScanner
+
+
+def test_overlapping_rules_see_their_own_finditer_matches():
+    text = "Fig. 2 spans 1-3 cm and 10 Hz; see Figure 4 and Fig.5 (ABC)."
+    patterns = [
+        (re.compile(r"\b(Fig\.|Figure)"), "A-Z"),
+        (re.compile(r"Fig\.\s+[0-9]"), "A-Z"),
+        (re.compile(r"\b\d+-\d+\b"), r"\d"),
+        (re.compile(r"(\d)\s+(cm|hz)", re.IGNORECASE), r"\d"),
+        (re.compile(r"\b[A-Z]{2,}\b"), None),
+    ]
+    seen = {index: [] for index in range(len(patterns))}
+    scanner = MultiPatternScanner()
+    for index, (pattern, first) in enumerate(patterns):
+        scanner.register(pattern, lambda match, index=index: seen[index].append(match.span()), first=first)
+    scanner.scan(text)
+    for index, (pattern, _) in enumerate(patterns):
+        assert seen[index] == [match.span() for match in pattern.finditer(text)]
@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+from pfread.utils.scheduler import run_pass_graph
+from pfread.utils.telemetry import Telemetry
+
+
+def test_independent_passes_overlap_and_dependencies_see_results():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def waiting(value):
+        def run(results):
+            barrier.wait()
+            return value
+
+        return run
+
+    telemetry = Telemetry()
+    results = run_pass_graph(
+        [
+            ("typo", [], waiting(1)),
+            ("paragraph", [], waiting(2)),
+            ("merge", ["typo", "paragraph"], lambda results: results["typo"] + results["paragraph"]),
+        ],
+        telemetry,
+    )
+    assert results == {"typo": 1, "paragraph": 2, "merge": 3}
+    assert set(telemetry.timings) == {"typo", "paragraph", "merge"}
+
+
+def test_unresolvable_dependencies_raise():
+    with pytest.raises(ValueError):
+        run_pass_graph([("paragraph", ["fused"], lambda results: None)])
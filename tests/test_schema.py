@@ -1,4 +1,4 @@
-from pfread.utils.schema import Issue, Span, issue_from_dict
+from pfread.utils.schema import Issue, Span, assign_stable_ids, issue_from_dict
 
 
 def test_issue_round_trip():
@@ -17,3 +17,26 @@ def test_issue_round_trip():
     data = issue.to_dict()
     clone = issue_from_dict(data)
     assert clone == issue
+
+
+def make_issue(excerpt, start, file="paper.tex"):
+    return Issue(
+        id="",
+        phase="typo",
+        type="spelling",
+        severity="minor",
+        span=Span(file=file, start=start, end=start + len(excerpt), line=1),
+        excerpt=excerpt,
+        suggestion="",
+        explanation="",
+        autofix="safe",
+    )
+
+
+def test_stable_ids_survive_upstream_changes():
+    first = assign_stable_ids([make_issue("teh  result", 40), make_issue("teh result", 10), make_issue("alot", 70)])
+    assert first[0].id + "-2" == first[1].id
+    assert first[2].id.startswith("ISS-") and "-" not in first[2].id[4:]
+    shifted = assign_stable_ids([make_issue("new issue", 0), make_issue("alot", 95)])
+    assert shifted[1].id == first[2].id
+    assert assign_stable_ids([make_issue("alot", 70, file="other.tex")])[0].id != first[2].id
@@ -1,10 +1,87 @@
+import random
 from pathlib import Path
 
 from pfread.llm import LLMClient
-from pfread.passes.sentences import run_sentences_pass
+from pfread.passes.sentences import run_sentences_pass, split_sentences, trim_segment
 from pfread.preprocess import flatten_sources
 
 
+def legacy_split_sentences(text):
+    sentences = []
+    start = 0
+    braces = 0
+    brackets = 0
+    inline_math = False
+    display_math = 0
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if text.startswith("\\(", index):
+            inline_math = True
+            index += 2
+            continue
+        if text.startswith("\\)", index):
+            inline_math = False
+            index += 2
+            continue
+        if text.startswith("\\[", index):
+            display_math += 1
+            index += 2
+            continue
+        if text.startswith("\\]", index):
+            if display_math > 0:
+                display_math -= 1
+            index += 2
+            continue
+        if char == "$":
+            inline_math = not inline_math
+            index += 1
+            continue
+        if char == "{":
+            braces += 1
+        elif char == "}":
+            if braces > 0:
+                braces -= 1
+        elif char == "[":
+            brackets += 1
+        elif char == "]":
+            if brackets > 0:
+                brackets -= 1
+        boundary = False
+        if char in {".", "!", "?"} and not braces and not brackets and not inline_math and display_math == 0:
+            peek = index + 1
+            while peek < length and text[peek] in {'"', "'", ")", "]"}:
+                peek += 1
+            if peek >= length or text[peek].isspace():
+                boundary = True
+        if boundary:
+            segment = text[start:index + 1]
+            cleaned, offset_left, offset_right = trim_segment(segment)
+            if cleaned:
+                sentences.append(
+                    {
+                        "text": cleaned,
+                        "start": start + offset_left,
+                        "end": start + offset_right,
+                    }
+                )
+            start = index + 1
+        index += 1
+    if start < length:
+        segment = text[start:length]
+        cleaned, offset_left, offset_right = trim_segment(segment)
+        if cleaned:
+            sentences.append(
+                {
+                    "text": cleaned,
+                    "start": start + offset_left,
+                    "end": start + offset_right,
+                }
+            )
+    return sentences
+
+
 def test_sentence_typo(tmp_path):
     tex_path = tmp_path / "paper.tex"
     tex_path.write_text("This is teh sentence.\n", encoding="utf-8")
@@ -17,3 +94,72 @@ def test_sentence_typo(tmp_path):
     assert issue.suggestion.strip().endswith("the sentence.")
     assert "-This is teh sentence." in diff_text
     assert "+This is the sentence." in diff_text
+
+
+def test_batched_sentences_match_individual_calls(tmp_path):
+    tex_path = tmp_path / "paper.tex"
+    tex_path.write_text(
+        "This is teh first sentence. The second one is fine. We use alot of words here. Last one.\n",
+        encoding="utf-8",
+    )
+    flattened = flatten_sources([tex_path])
+    single = LLMClient(fake=True)
+    expected, _, expected_diff = run_sentences_pass(flattened["text"], flattened["index"], single)
+    batched = LLMClient(fake=True)
+    issues, _, diff_text = run_sentences_pass(flattened["text"], flattened["index"], batched, batch_tokens=200)
+    assert [issue.to_dict() for issue in issues] == [issue.to_dict() for issue in expected]
+    assert diff_text == expected_diff
+    assert len(batched.telemetry.records) == 1
+    assert len(single.telemetry.records) == 4
+
+
+class MalformedBatchClient(LLMClient):
+    def _fake_sentence_batch(self, data):
+        return {"results": [{"id": "unknown", "status": "ok"}]}
+
+
+def test_malformed_batch_falls_back_to_single_sentences(tmp_path):
+    tex_path = tmp_path / "paper.tex"
+    tex_path.write_text("This is teh sentence. Another sentence.\n", encoding="utf-8")
+    flattened = flatten_sources([tex_path])
+    llm = MalformedBatchClient(fake=True)
+    issues, _, _ = run_sentences_pass(flattened["text"], flattened["index"], llm, batch_tokens=200)
+    assert len(issues) == 1
+    assert len(llm.telemetry.records) == 3
+
+
+class FailingBatchClient(LLMClient):
+    def _fake_sentence_batch(self, data):
+        raise ValueError("Model returned non-JSON content")
+
+
+def test_failed_batch_call_falls_back_to_single_sentences(tmp_path):
+    tex_path = tmp_path / "paper.tex"
+    tex_path.write_text("This is teh sentence. Another sentence.\n", encoding="utf-8")
+    flattened = flatten_sources([tex_path])
+    llm = FailingBatchClient(fake=True, concurrency=4)
+    issues, _, _ = run_sentences_pass(flattened["text"], flattened["index"], llm, batch_tokens=200)
+    assert len(issues) == 1
+    assert llm.telemetry.summary()["llm"]["permanent"] == 1
+    assert len(llm.telemetry.records) == 2
+
+
+def test_splitter_matches_legacy_walker_without_abbreviations():
+    rng = random.Random(7)
+    alphabet = list("ab .!?$\\{}[]\"')\n") + ["\\(", "\\)", "\\[", "\\]", "e.g.", " Fig. ", "et al. "]
+    samples = [
+        "First. Second! Third? \\(a. b\\) $x. y$ {c. d} [e. f] \\[g. h\\] end.",
+        'He said "done." (Really.) Next.',
+    ]
+    samples.extend("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(5000))
+    for text in samples:
+        assert split_sentences(text, abbreviations=()) == legacy_split_sentences(text)
+
+
+def test_splitter_keeps_abbreviations_inside_sentences():
+    text = "We follow Smith et al. in this. See Fig. 3, e.g. the left panel. Done."
+    assert [sentence["text"] for sentence in split_sentences(text)] == [
+        "We follow Smith et al. in this.",
+        "See Fig. 3, e.g. the left panel.",
+        "Done.",
+    ]
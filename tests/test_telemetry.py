@@ -0,0 +1,49 @@
+import json
+import threading
+
+from pfread.llm import LLMClient
+from pfread.utils.telemetry import Telemetry, percentile
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert [percentile(values, rank) for rank in (50, 90, 99)] == [50.0, 90.0, 99.0]
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_spans_from_threads_aggregate_and_export(tmp_path):
+    telemetry = Telemetry()
+
+    def work():
+        for _ in range(50):
+            with telemetry.span("check", "cross"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    telemetry.start_timer("cross")
+    telemetry.stop_timer("cross")
+    histograms = telemetry.summary()["latency"]
+    assert histograms["cross:check"]["count"] == 200
+    assert histograms["pass:cross"]["count"] == 1
+    assert histograms["cross:check"]["p50_ms"] <= histograms["cross:check"]["p99_ms"]
+
+    telemetry.write_trace(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))["traceEvents"]
+    complete = [event for event in events if event["ph"] == "X"]
+    assert len(complete) == 201
+    assert len({event["tid"] for event in complete}) >= 2
+    assert all(event["dur"] >= 0 and event["ts"] >= 0 for event in complete)
+    assert {event["args"]["name"] for event in events if event["ph"] == "M"} >= {"MainThread"}
+
+
+def test_llm_calls_are_traced_per_task():
+    llm = LLMClient(fake=True)
+    llm.complete_json_many("system", [json.dumps({"task": "proofread_sentence", "sentence": "Fine."})] * 3)
+    histograms = llm.telemetry.histograms()
+    assert histograms["llm:proofread_sentence"]["count"] == 3
+    assert histograms["llm.attempt:attempt"]["count"] == 3
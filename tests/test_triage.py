@@ -0,0 +1,56 @@
+from pfread.llm import LLMClient
+from pfread.passes.sentences import run_sentences_pass
+from pfread.passes.triage import needs_llm, triage_signals, unknown_words
+from pfread.preprocess import flatten_sources
+
+
+def test_triage_signals():
+    assert triage_signals("This is teh result.") == ["spelling"]
+    assert triage_signals("We ran the the experiment.") == ["repeated_word"]
+    assert triage_signals("It took a hour.") == []
+    assert triage_signals("We saw a apple.") == ["article"]
+    assert triage_signals("The models is fast and they is cheap.") == ["agreement"]
+    assert triage_signals("Results ,however, vary.") == ["punctuation"]
+    assert triage_signals("An hour later a user left.") == []
+    assert triage_signals("We recieved the experimnet logs.") == ["spelling"]
+    assert triage_signals("Smith and the LSTM baseline don't converge.") == []
+
+
+def test_triage_levels_trade_recall_for_calls():
+    long_sentence = " ".join(["We measured the effect of the proposed change on every model in our study"] * 2) + "."
+    dense = "We set $x = \\alpha + \\beta_i$ and $y$."
+    assert [needs_llm(long_sentence, level) for level in ("off", "conservative", "balanced", "aggressive")] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert needs_llm(dense, "conservative") is False
+    assert needs_llm("teh " + dense, "aggressive") is True
+
+
+def test_triage_skips_clean_sentences(tmp_path):
+    tex_path = tmp_path / "paper.tex"
+    tex_path.write_text(
+        "This is teh first sentence. The second one is fine. We use alot of words here. Last one.\n",
+        encoding="utf-8",
+    )
+    flattened = flatten_sources([tex_path])
+    expected, _, _ = run_sentences_pass(flattened["text"], flattened["index"], LLMClient(fake=True))
+    llm = LLMClient(fake=True)
+    issues, _, _ = run_sentences_pass(flattened["text"], flattened["index"], llm, triage="balanced")
+    assert [issue.to_dict() for issue in issues] == [issue.to_dict() for issue in expected]
+    assert len(llm.telemetry.records) == 2
+    assert llm.telemetry.summary()["triage"] == {"sent": 2, "skipped": 2}
+
+
+def test_lexicon_knows_common_ml_vocabulary():
+    sentences = [
+        "We train a multi head softmax classifier on tokenized inputs with a regularizer.",
+        "The autoregressive decoder maps logits through relu and gelu layers with layernorm.",
+        "Each minibatch is pretrained with dropout, then finetuned on the downstream datasets.",
+        "Embeddings from the backbone are quantized before evaluation on the benchmark.",
+    ]
+    for sentence in sentences:
+        assert unknown_words(sentence) == []
+    assert unknown_words("The modle is trained with a regularizer.") == ["modle"]